@@ -6,35 +6,45 @@ import sys
 import os
 from pathlib import Path
 
+# Must be the first Streamlit command of every run
+st.set_page_config(layout="wide", page_title="Quake 3 Analysis Dashboard", page_icon="🎮")
+
 # Add the project root directory to Python's module search path
 project_root = str(Path(__file__).resolve().parent.parent)
 sys.path.insert(0, project_root)
 
-from sidebar.home.welcome import show_welcome
-from sidebar.demographic.dg import show_demographic
-from sidebar.reports.reports import show_reports
-from sidebar.support.support import show_support
-from sidebar.analysis.analysis import show_analysis
+from config import DEV_PANEL
+from utils.profiling import instrument_streamlit, section, show_dev_panel, time_page
+from utils.services import start_background_services
+
+instrument_streamlit()
 
+# Page modules are imported the first time their page is opened, so heavy
+# libraries (statsmodels, scipy, plotly) are not loaded at startup
 pages = [
-    {"name": "Home", "icon": "house"},
-    {"name": "Demographic", "icon": "people"},
-    {"name": "Reports", "icon": "clipboard-data"},
-    {"name": "Analysis", "icon": "graph-up-arrow"},
-    {"name": "Support", "icon": "question-circle"}
+    {"name": "Home", "icon": "house", "module": "sidebar.home.welcome", "function": "show_welcome"},
+    {"name": "Demographic", "icon": "people", "module": "sidebar.demographic.dg", "function": "show_demographic"},
+    {"name": "Reports", "icon": "clipboard-data", "module": "sidebar.reports.reports", "function": "show_reports"},
+    {"name": "Analysis", "icon": "graph-up-arrow", "module": "sidebar.analysis.analysis", "function": "show_analysis"},
+    {"name": "Support", "icon": "question-circle", "module": "sidebar.support.support", "function": "show_support"}
 ]
 
 def display_page(page_name):
-    if page_name == "Home":
-        show_welcome()
-    elif page_name == "Demographic":
-        show_demographic()
-    elif page_name == "Reports":
-        show_reports()
-    elif page_name == "Analysis":
-        show_analysis()
-    elif page_name == "Support":
-        show_support()
+    """Render a page and return its PageRun with the load/compute/render timings."""
+    page = next((page for page in pages if page["name"] == page_name), None)
+    if page is None:
+        return None
+
+    # The toggle profiles a single rerun, so switch it off before it is drawn again
+    profile = st.session_state.get('profile_rerun', False)
+    if profile:
+        st.session_state.profile_rerun = False
+    with time_page(page_name, profile=profile) as run:
+        # A page's first import pulls in its heavy libraries; count that as loading
+        with section('load'):
+            module = importlib.import_module(page["module"])
+        getattr(module, page["function"])()
+    return run
 
 # Initialize session state
 if 'current_page' not in st.session_state:
@@ -58,7 +68,11 @@ with st.sidebar:
         st.rerun()
 
 # Display the selected page
-display_page(st.session_state.current_page)
+run = display_page(st.session_state.current_page)
+
+# Developer panel: DEV_PANEL=1 in the environment, or ?dev=1 in the URL
+if DEV_PANEL or st.query_params.get('dev') == '1':
+    show_dev_panel(run)
 
 def add_footer():
     year = datetime.now().year
@@ -70,4 +84,8 @@ def add_footer():
     """
     st.markdown(footer, unsafe_allow_html=True)
 
-add_footer()
\ No newline at end of file
+add_footer()
+
+# Started once the first page is drawn, so the watchers' imports and first
+# scans do not hold up the first rerun
+start_background_services()
@@ -0,0 +1,214 @@
+# Headless benchmark of the Analysis page's data path for different player
+# counts and session lengths. Each configuration runs in a fresh process:
+# a synthetic game log is pushed through the pipeline, matching activity files
+# are generated, and then the page's own functions are timed stage by stage:
+# load -> window -> create_frequency_data -> clean -> each statistical test.
+#
+# Usage:
+#   python benchmarks/analysis_benchmark.py                              # 1,2,4 players x 10,30 minutes
+#   python benchmarks/analysis_benchmark.py --players 4 --minutes 60 --sample-rate 1000
+#   python benchmarks/analysis_benchmark.py --data final-data --players 2  # real log, synthetic activity
+
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.synthetic_activity import SAMPLE_RATE_HZ, generate_for_players, session_from_log
+from benchmarks.synthetic_log import generate_log
+
+KILLS_PER_ROUND = 40
+# Roughly two and a half minutes of play per synthetic round at the default density
+SECONDS_PER_ROUND = 150
+
+
+def peak_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_session(tmp, players, minutes, data, seed):
+    """Processed data folder and activity folder for one configuration."""
+    activity_folder = os.path.join(tmp, 'activity')
+    if data:
+        data_folder = data
+    else:
+        from benchmarks.pipeline_scaling import pipeline_stages, run_stage
+
+        raw, logs, data_folder = (os.path.join(tmp, name) for name in ['raw', 'logs', 'data'])
+        for folder in [raw, logs, data_folder]:
+            os.makedirs(folder)
+        rounds = max(2, round(minutes * 60 / SECONDS_PER_ROUND))
+        generate_log(os.path.join(raw, 'synthetic.log'), players=players, rounds=rounds,
+                     kills_per_round=KILLS_PER_ROUND, seed=seed)
+        env = {**os.environ, 'PYTHONPATH': str(project_root), 'RAW_DATA_FOLDER': raw,
+               'LOG_FOLDER': logs, 'PROCESSED_DATA_FOLDER': data_folder}
+        # Only the stages up to player_performance.csv are needed
+        for script in pipeline_stages():
+            status, _, _, error = run_stage(script, env, timeout=3600)
+            if status != 'ok':
+                raise RuntimeError(f"{script} failed: {error}")
+            if Path(script).stem == '12_additional_counters':
+                break
+
+    import pandas as pd
+    player_performance = pd.read_csv(os.path.join(data_folder, 'player_performance.csv'))
+    ips, start, end, rounds = session_from_log(player_performance)
+    return data_folder, activity_folder, ips[:players], start, end, rounds
+
+
+def run_worker(args):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_folder, activity_folder, ips, start, end, rounds = build_session(
+            tmp, args.players, args.minutes, args.data, args.seed)
+        generate_for_players(activity_folder, ips, start, end, rounds, args.sample_rate, args.seed)
+
+        # Point the app's settings at the generated data before importing it
+        os.environ['PROCESSED_DATA_FOLDER'] = data_folder
+        os.environ['ACTIVITY_FOLDER'] = activity_folder
+        os.environ['MODEL_CACHE_FOLDER'] = os.path.join(tmp, 'models')
+        os.chdir(project_root)
+
+        import pandas as pd
+        import pytz
+        from datetime import timedelta
+        from sidebar.analysis.analysis import activity_window, clean_data, create_frequency_data
+        from sidebar.analysis.stat_tests import ANALYSES
+        from utils.activity_cache import get_activity_cache
+        from utils.datasets import get_dataset
+        from utils.event_windows import INPUT_COLUMNS
+
+        aest = pytz.timezone('Australia/Sydney')
+        player_performance = get_dataset('player_performance')
+        player_performance['timestamp'] = player_performance['timestamp'].dt.tz_localize('UTC').dt.tz_convert(aest)
+        players = [f'Player_{ip}' for ip in ips]
+        latencies = sorted(player_performance['latency'].dropna().unique())
+        if args.latencies:
+            latencies = latencies[:args.latencies]
+
+        def record(stage, started, **extra):
+            row = {'players': len(players), 'minutes': round((end - start) / 60, 1), 'stage': stage,
+                   'seconds': round(time.perf_counter() - started, 4), 'peak_mb': round(peak_mb(), 1), **extra}
+            rows.append(row)
+            print(json.dumps(row), file=sys.stderr)
+
+        started = time.perf_counter()
+        activity = {player: get_activity_cache().get(ip) for player, ip in zip(players, ips)}
+        record('load', started, rows=sum(len(frame) for frame in activity.values()))
+
+        started = time.perf_counter()
+        windows = []
+        for player in players:
+            for latency in latencies:
+                latency_data = player_performance[(player_performance['killer_ip'] == player) &
+                                                  (player_performance['latency'] == latency)]
+                if not latency_data.empty:
+                    window_start = latency_data['timestamp'].min()
+                    window = activity_window(activity[player], window_start, window_start + timedelta(minutes=10), aest)
+                    windows.append((player, latency, window_start, window))
+        record('window', started, rows=sum(len(window) for *_, window in windows))
+
+        started = time.perf_counter()
+        frequency = []
+        for player, latency, window_start, window in windows:
+            freq_data = create_frequency_data(window, INPUT_COLUMNS, window_start)
+            freq_data['Player'] = player
+            freq_data['Latency'] = latency
+            frequency.append(freq_data)
+        record('create_frequency_data', started, rows=sum(len(frame) for frame in frequency))
+
+        if not frequency:
+            raise RuntimeError('No activity windows for the selected players and latencies')
+
+        started = time.perf_counter()
+        df = clean_data(pd.concat(frequency, ignore_index=True), args.column)
+        analysis_data = df[[f'{args.column}_diff', 'Latency']]
+        record('clean', started, rows=len(df))
+
+        settings = {
+            'n_iterations': args.resamples,
+            'bootstrap_method': args.bootstrap_method,
+            'confidence_level': 0.95,
+            'bootstrap_seed': 42,
+            'baseline_latency': latencies[0],
+        }
+        analyses = args.analyses.split(',') if args.analyses else list(ANALYSES)
+        for name in analyses:
+            started = time.perf_counter()
+            try:
+                ANALYSES[name](analysis_data, args.column, settings)
+                status = 'ok'
+            except Exception as e:
+                status = f'error: {e}'
+            record(name, started, rows=len(analysis_data), status=status)
+
+    print(json.dumps(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Analysis page data path headlessly.')
+    parser.add_argument('--players', default='1,2,4', help='comma-separated player counts')
+    parser.add_argument('--minutes', default='10,30', help='comma-separated session lengths')
+    parser.add_argument('--data', help='use this processed data folder instead of a synthetic log')
+    parser.add_argument('--sample-rate', type=float, default=SAMPLE_RATE_HZ)
+    parser.add_argument('--latencies', type=int, help='analyse only the first N latencies')
+    parser.add_argument('--column', default='mouse_clicks')
+    parser.add_argument('--analyses', help='comma-separated analyses to time (default: all)')
+    parser.add_argument('--resamples', type=int, default=10000)
+    parser.add_argument('--bootstrap-method', default='percentile', choices=['percentile', 'bca'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write one CSV row per configuration and stage')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.players = int(args.players)
+        args.minutes = float(args.minutes)
+        run_worker(args)
+        return
+
+    minutes_options = [None] if args.data else [float(value) for value in args.minutes.split(',')]
+    rows = []
+    for players in [int(value) for value in args.players.split(',')]:
+        for minutes in minutes_options:
+            command = [sys.executable, __file__, '--worker', '--players', str(players),
+                       '--minutes', str(minutes or 0), '--sample-rate', str(args.sample_rate),
+                       '--column', args.column, '--resamples', str(args.resamples),
+                       '--bootstrap-method', args.bootstrap_method, '--seed', str(args.seed)]
+            for option in ['data', 'latencies', 'analyses']:
+                if getattr(args, option):
+                    command += [f'--{option}', str(getattr(args, option))]
+
+            label = f"{players} player(s), {'real log' if args.data else f'{minutes:g} min'}"
+            print(f"== {label}")
+            result = subprocess.run(command, cwd=project_root, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"   failed: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode}")
+                continue
+            config_rows = json.loads(result.stdout.strip().splitlines()[-1])
+            for row in config_rows:
+                print(f"   {row['stage']:<22} {row['seconds']:9.3f}s {row['peak_mb']:9.1f} MB  {row['rows']:>10} rows"
+                      f"{'  ' + row['status'] if row.get('status', 'ok') != 'ok' else ''}")
+            rows.extend(config_rows)
+
+    if args.output and rows:
+        fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+        with open(args.output, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
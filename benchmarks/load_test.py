@@ -0,0 +1,441 @@
+# Load test for the dashboard: starts app/zeta.py under `streamlit run` and
+# drives N concurrent scripted sessions over the same websocket protocol the
+# browser uses. Every session loops through Reports, Analysis and Demographic,
+# changing filters the way a researcher would; filter widgets inside fragments
+# send fragment reruns, like the browser does.
+#
+# Reported per page and action:
+#   - p50/p95/p99 rerun latency as seen by the client (request to script finished)
+#   - server-side load/compute/render split and cache hit rates, read from the
+#     page timings log the app writes for every full rerun
+#   - server memory: RSS before and after, peak, and growth per session
+#
+# The client needs the `websockets` package (pip install websockets).
+#
+# Usage:
+#   python benchmarks/load_test.py                                  # 1, 4 and 8 sessions
+#   python benchmarks/load_test.py --sessions 16 --duration 120 --output load.csv
+#   python benchmarks/load_test.py --data final-data --activity app/import/activity_data
+
+import argparse
+import csv
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+# Matches the options of the main menu in app/zeta.py
+PAGES = ['Home', 'Demographic', 'Reports', 'Analysis', 'Support']
+REPORTS = ['Latency', 'Round', 'Player Performance']
+ACTIVITY_SAMPLE_RATE_HZ = 100
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, env, log, timeout=60):
+    command = [sys.executable, '-m', 'streamlit', 'run', str(project_root / 'app' / 'zeta.py'),
+               '--server.headless', 'true', '--server.port', str(port), '--server.address', '127.0.0.1',
+               '--browser.gatherUsageStats', 'false', '--server.fileWatcherType', 'none']
+    # A pipe nobody drains would stall the server once it fills, so its output goes to a file
+    server = subprocess.Popen(command, cwd=project_root, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"Streamlit exited: {log.read().decode(errors='replace')[-500:]}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"Streamlit did not start within {timeout}s")
+
+
+def process_memory(pid):
+    # Resident and peak resident memory in MB, from /proc (Linux)
+    values = {}
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                values[key] = int(value.split()[0]) / 1024
+    return values['VmRSS'], values['VmHWM']
+
+
+class Session:
+    """
+    One scripted browser session. Keeps the widgets the last run rendered and
+    the values set so far, and sends them with every rerun request.
+    """
+
+    def __init__(self, ws, timeout):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self._BackMsg, self._ForwardMsg, self._WidgetState = BackMsg, ForwardMsg, WidgetState
+        self.timeout = timeout
+        self.ws = ws
+        self.page_script_hash = ''
+        self.widgets = {}
+        self.components = []
+        self.states = {}
+        self._messages = {}
+
+    def rerun(self, fragment_id=None):
+        """Request a rerun and wait until it finishes; returns (seconds, exceptions)."""
+        message = self._BackMsg()
+        client_state = message.rerun_script
+        client_state.page_script_hash = self.page_script_hash
+        # Like the browser, only send the state of widgets that are on screen: the main
+        # menu's id changes with the page, and a stale one would navigate back again
+        shown = {proto.id for proto, _ in self.widgets.values()} | {component.id for component, _ in self.components}
+        self.states = {id: state for id, state in self.states.items() if id in shown}
+        client_state.widget_states.widgets.extend(self.states.values())
+        if fragment_id:
+            client_state.fragment_id = fragment_id
+        else:
+            self.widgets, self.components = {}, []
+
+        exceptions = []
+        started = time.perf_counter()
+        self.ws.send(message.SerializeToString())
+        finished = self._ForwardMsg.ScriptFinishedStatus
+        while True:
+            forward = self._receive()
+            kind = forward.WhichOneof('type')
+            if kind == 'new_session':
+                self.page_script_hash = forward.new_session.page_script_hash
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                self._element(forward.delta.new_element, forward.delta.fragment_id, exceptions)
+            elif kind == 'script_finished':
+                if forward.script_finished == finished.Value('FINISHED_EARLY_FOR_RERUN'):
+                    # st.rerun(): the next run redraws everything
+                    self.widgets, self.components = {}, []
+                    continue
+                return time.perf_counter() - started, exceptions
+
+    def _receive(self):
+        forward = self._ForwardMsg.FromString(self.ws.recv(timeout=self.timeout))
+        # Large messages the session has already received may come back as a reference
+        if forward.WhichOneof('type') == 'ref_hash':
+            return self._messages[forward.ref_hash]
+        if forward.hash:
+            self._messages[forward.hash] = forward
+        return forward
+
+    def _element(self, element, fragment_id, exceptions):
+        kind = element.WhichOneof('type')
+        if kind == 'exception':
+            exceptions.append(element.exception.message)
+        elif kind == 'component_instance':
+            self.components.append((element.component_instance, fragment_id))
+        elif kind in ('checkbox', 'radio', 'selectbox', 'multiselect'):
+            proto = getattr(element, kind)
+            self.widgets[(kind, proto.label)] = (proto, fragment_id)
+
+    def options(self, kind, label):
+        proto, _ = self.widgets[(kind, label)]
+        return list(proto.options)
+
+    def has(self, kind, label):
+        return (kind, label) in self.widgets
+
+    def labels(self, kind):
+        return [label for widget_kind, label in self.widgets if widget_kind == kind]
+
+    def set(self, kind, label, value):
+        """Change a widget and rerun the way the browser would (fragment-only inside a fragment)."""
+        proto, fragment_id = self.widgets[(kind, label)]
+        state = self._WidgetState(id=proto.id)
+        fields = proto.DESCRIPTOR.fields_by_name
+        if kind == 'checkbox':
+            state.bool_value = value
+        elif kind in ('radio', 'selectbox'):
+            # Newer Streamlit sends the option itself, older versions its index
+            if 'raw_value' in fields:
+                state.string_value = value
+            else:
+                state.int_value = list(proto.options).index(value)
+        else:
+            if 'raw_values' in fields:
+                state.string_array_value.data.extend(value)
+            else:
+                state.int_array_value.data.extend(list(proto.options).index(option) for option in value)
+        self.states[proto.id] = state
+        return self.rerun(fragment_id or None)
+
+    def navigate(self, page):
+        # The main menu is a custom component whose value is the page name
+        for component, fragment_id in self.components:
+            if page in component.json_args and all(name in component.json_args for name in PAGES):
+                self.states[component.id] = self._WidgetState(id=component.id, json_value=json.dumps(page))
+                return self.rerun(fragment_id or None)
+        raise RuntimeError('Main menu not found in the last run')
+
+
+def reports_actions(session, rng):
+    report = rng.choice(REPORTS)
+    yield 'Reports', 'navigate', lambda: session.navigate('Reports')
+    yield 'Reports', f'open {report}', lambda: session.set('selectbox', 'Select analysis type', report)
+    for _ in range(rng.randint(2, 5)):
+        checkboxes = session.labels('checkbox')
+        radios = [label for label in session.labels('radio') if len(session.options('radio', label)) > 1]
+        if radios and rng.random() < 0.3:
+            label = rng.choice(radios)
+            yield 'Reports', f'{report} radio', lambda: session.set(
+                'radio', label, rng.choice(session.options('radio', label)))
+        elif checkboxes:
+            label = rng.choice(checkboxes)
+            value = session.states.get(session.widgets[('checkbox', label)][0].id)
+            checked = value.bool_value if value is not None else session.widgets[('checkbox', label)][0].default
+            yield 'Reports', f'{report} checkbox', lambda: session.set('checkbox', label, not checked)
+
+
+def analysis_actions(session, rng):
+    yield 'Analysis', 'navigate', lambda: session.navigate('Analysis')
+    if not session.has('multiselect', 'Select Players'):
+        return
+    # Analyses run in the foreground so their cost shows up in the rerun latency
+    if session.has('checkbox', 'Run analyses in background'):
+        yield 'Analysis', 'foreground', lambda: session.set('checkbox', 'Run analyses in background', False)
+    # Only real players have activity files; '<world>' and a missing latency are listed too
+    players = [player for player in session.options('multiselect', 'Select Players') if player.startswith('Player_')]
+    yield 'Analysis', 'select players', lambda: session.set(
+        'multiselect', 'Select Players', rng.sample(players, min(2, len(players))))
+    latencies = [latency for latency in session.options('multiselect', 'Select Latencies') if latency != 'nan']
+    yield 'Analysis', 'select latencies', lambda: session.set(
+        'multiselect', 'Select Latencies', rng.sample(latencies, min(2, len(latencies))))
+    extra = rng.choice(['Perform ANOVA', 'Kruskal-Wallis Test', 'Show CDF', 'Bootstrap Analysis'])
+    if session.has('checkbox', extra):
+        yield 'Analysis', extra, lambda: session.set('checkbox', extra, True)
+
+
+def demographic_actions(session, rng):
+    yield 'Demographic', 'navigate', lambda: session.navigate('Demographic')
+    label = 'Select Question/s to Analyse'
+    if session.has('multiselect', label):
+        options = session.options('multiselect', label)
+        yield 'Demographic', 'select questions', lambda: session.set(
+            'multiselect', label, rng.sample(options, rng.randint(1, min(3, len(options)))))
+
+
+SCENARIOS = {
+    'Reports': (reports_actions, 3),
+    'Analysis': (analysis_actions, 1),
+    'Demographic': (demographic_actions, 1),
+}
+
+
+def run_session(index, url, deadline, think_time, timeout, seed, samples, errors):
+    from websockets.sync.client import connect
+
+    rng = random.Random(seed + index)
+    try:
+        with connect(url, subprotocols=['streamlit'], max_size=None, open_timeout=timeout) as ws:
+            run_actions(index, Session(ws, timeout), rng, deadline, think_time, samples, errors)
+    except Exception as e:
+        errors.append(f"session {index}: {type(e).__name__}: {e}")
+
+
+def run_actions(index, session, rng, deadline, think_time, samples, errors):
+    seconds, exceptions = session.rerun()
+    samples.append({'session': index, 'page': 'Home', 'action': 'open', 'seconds': seconds})
+    pages = list(SCENARIOS)
+    weights = [SCENARIOS[page][1] for page in pages]
+    while time.time() < deadline:
+        actions = SCENARIOS[rng.choices(pages, weights)[0]][0]
+        # The generators read the widgets of the previous step, so run each step before the next
+        for page, action, step in actions(session, rng):
+            if time.time() >= deadline:
+                break
+            time.sleep(rng.uniform(0, 2 * think_time))
+            seconds, exceptions = step()
+            samples.append({'session': index, 'page': page, 'action': action, 'seconds': seconds})
+            for exception in exceptions:
+                errors.append(f"session {index} {page} {action}: {exception}")
+
+
+def percentiles(values):
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50_ms': round(p50 * 1000, 1), 'p95_ms': round(p95 * 1000, 1), 'p99_ms': round(p99 * 1000, 1)}
+
+
+def summarise_server(log_path):
+    """Per-page sections and cache hit rates from the app's page timings log."""
+    pages = {}
+    if not os.path.exists(log_path):
+        return pages
+    with open(log_path) as log:
+        for line in log:
+            record = json.loads(line)
+            page = pages.setdefault(record['page'], {'runs': 0, 'load': 0.0, 'compute': 0.0, 'render': 0.0,
+                                                     'hits': 0, 'misses': 0})
+            page['runs'] += 1
+            for section in ('load', 'compute', 'render'):
+                page[section] += record[section]
+            for counts in record['cache'].values():
+                page['hits'] += counts['hits']
+                page['misses'] += counts['misses']
+    return pages
+
+
+def prepare_activity(data, folder, sample_rate, seed):
+    import pandas as pd
+    from benchmarks.synthetic_activity import generate_for_players, session_from_log
+
+    player_performance = pd.read_csv(os.path.join(data, 'player_performance.csv'))
+    ips, start, end, rounds = session_from_log(player_performance)
+    generate_for_players(folder, ips, start, end, rounds, sample_rate, seed)
+
+
+def server_env(args, tmp):
+    # Everything the server writes goes to the temporary folder: the activity
+    # watcher's store and catalog, and the ingest service's import and staging
+    # folders. The synthetic activity files use the real players' IPs.
+    env = {**os.environ, 'PYTHONPATH': str(project_root),
+           'ACTIVITY_FOLDER': args.activity or os.path.join(tmp, 'activity'),
+           'ACTIVITY_STORE_FOLDER': os.path.join(tmp, 'activity_store'),
+           'IMPORT_FOLDER': os.path.join(tmp, 'import'),
+           'INGEST_STAGING_FOLDER': os.path.join(tmp, 'ingest')}
+    if args.data:
+        env['PROCESSED_DATA_FOLDER'] = args.data
+    return env
+
+
+def convert_activity(env):
+    # Converted before the server starts, so its activity watcher finds every
+    # file in the catalog and no conversion competes with the measured sessions
+    code = ("import glob, os\n"
+            "from config import ACTIVITY_FOLDER\n"
+            "from utils.activity_store import ACTIVITY_SUFFIX, convert_activity_file, register\n"
+            "for path in sorted(glob.glob(os.path.join(ACTIVITY_FOLDER, '*' + ACTIVITY_SUFFIX))):\n"
+            "    register(path, convert_activity_file(path))\n")
+    subprocess.run([sys.executable, '-c', code], cwd=project_root, env=env, check=True)
+
+
+def run_level(sessions, args, tmp):
+    port = free_port()
+    log_path = os.path.join(tmp, f'page_timings_{sessions}.log')
+    env = {**server_env(args, tmp), 'PAGE_TIMINGS_LOG': log_path,
+           'MODEL_CACHE_FOLDER': os.path.join(tmp, f'models_{sessions}')}
+
+    with open(os.path.join(tmp, f'server_{sessions}.log'), 'w+b') as server_log:
+        server = start_server(port, env, server_log)
+        try:
+            rss_before, _ = process_memory(server.pid)
+            samples, errors = [], []
+            deadline = time.time() + args.duration
+            threads = [threading.Thread(target=run_session, args=(
+                index, f'ws://127.0.0.1:{port}/_stcore/stream', deadline, args.think_time, args.timeout,
+                args.seed, samples, errors)) for index in range(sessions)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            rss_after, rss_peak = process_memory(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+
+    server_pages = summarise_server(log_path)
+    rows = []
+    groups = {}
+    for sample in samples:
+        groups.setdefault((sample['page'], sample['action']), []).append(sample['seconds'])
+        groups.setdefault((sample['page'], 'all'), []).append(sample['seconds'])
+    for (page, action), values in sorted(groups.items()):
+        row = {'sessions': sessions, 'page': page, 'action': action, 'reruns': len(values), **percentiles(values)}
+        server_page = server_pages.get(page)
+        if action == 'all' and server_page:
+            runs = server_page['runs']
+            lookups = server_page['hits'] + server_page['misses']
+            row.update({
+                'server_runs': runs,
+                'load_ms': round(server_page['load'] / runs * 1000, 1),
+                'compute_ms': round(server_page['compute'] / runs * 1000, 1),
+                'render_ms': round(server_page['render'] / runs * 1000, 1),
+                'cache_hit_rate': round(server_page['hits'] / lookups, 3) if lookups else '',
+            })
+        rows.append(row)
+    memory = {'sessions': sessions, 'rss_before_mb': round(rss_before, 1), 'rss_after_mb': round(rss_after, 1),
+              'rss_peak_mb': round(rss_peak, 1),
+              'growth_per_session_mb': round((rss_after - rss_before) / sessions, 1)}
+    return rows, memory, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the dashboard with concurrent scripted sessions.')
+    parser.add_argument('--sessions', default='1,4,8', help='comma-separated numbers of concurrent sessions')
+    parser.add_argument('--duration', type=float, default=60, help='seconds each level runs for')
+    parser.add_argument('--think-time', type=float, default=0.5, help='mean pause between actions, seconds')
+    parser.add_argument('--timeout', type=float, default=300, help='seconds to wait for one rerun')
+    parser.add_argument('--data', help='processed data folder (default: the app setting)')
+    parser.add_argument('--activity', help='activity folder (default: synthetic files matching the data)')
+    parser.add_argument('--sample-rate', type=float, default=ACTIVITY_SAMPLE_RATE_HZ,
+                        help='samples per second of the synthetic activity files')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the latency rows to this CSV')
+    args = parser.parse_args()
+
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        parser.error('the load test needs the websockets package: pip install websockets')
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.activity:
+            from config import PROCESSED_DATA_FOLDER
+            prepare_activity(args.data or str(project_root / PROCESSED_DATA_FOLDER), os.path.join(tmp, 'activity'),
+                             args.sample_rate, args.seed)
+        convert_activity(server_env(args, tmp))
+
+        for sessions in [int(value) for value in args.sessions.split(',')]:
+            print(f"== {sessions} session(s), {args.duration:g}s")
+            rows, memory, errors = run_level(sessions, args, tmp)
+            for row in rows:
+                if row['action'] != 'all':
+                    continue
+                server = (f"  load {row['load_ms']:.0f} / compute {row['compute_ms']:.0f} / render "
+                          f"{row['render_ms']:.0f} ms, cache hits {row['cache_hit_rate'] if row['cache_hit_rate'] != '' else 'n/a'}"
+                          if 'server_runs' in row else '')
+                print(f"   {row['page']:<12} {row['reruns']:>5} reruns  p50 {row['p50_ms']:>8.1f}  "
+                      f"p95 {row['p95_ms']:>8.1f}  p99 {row['p99_ms']:>8.1f} ms{server}")
+            print(f"   memory: {memory['rss_before_mb']:.0f} -> {memory['rss_after_mb']:.0f} MB "
+                  f"(peak {memory['rss_peak_mb']:.0f} MB, {memory['growth_per_session_mb']:+.1f} MB per session)")
+            for error in errors[:10]:
+                print(f"   error: {error}")
+            if len(errors) > 10:
+                print(f"   ... {len(errors) - 10} more errors")
+            results.extend({**row, **{key: value for key, value in memory.items() if key != 'sessions'}}
+                           for row in rows)
+
+    if args.output and results:
+        fieldnames = list(dict.fromkeys(key for row in results for key in row))
+        with open(args.output, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# Runs every pipeline stage on synthetic logs of increasing size and records
+# wall time and peak memory (max RSS) per stage and for the whole pipeline.
+# Each stage runs as its own process, exactly like processes/run_all.py, with
+# the folder settings pointed at a scratch directory per tier.
+#
+# Usage:
+#   python benchmarks/pipeline_scaling.py                          # small, medium
+#   python benchmarks/pipeline_scaling.py --tiers small,medium,large --timeout 1800
+#   python benchmarks/pipeline_scaling.py --output results.csv --plot curves.html
+
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.synthetic_log import generate_log
+from utils.pipeline import PIPELINE_SCRIPTS
+
+# Approximate kill events per tier
+TIERS = {
+    'tiny': 500,
+    'small': 2_000,
+    'medium': 10_000,
+    'large': 100_000,
+    'xlarge': 1_000_000,
+    'huge': 10_000_000,
+}
+
+
+def pipeline_stages():
+    return list(PIPELINE_SCRIPTS)
+
+
+# Runs a stage script as __main__ and writes its own peak RSS (kB) to
+# STAGE_PEAK_FILE on exit. ru_maxrss from wait4 is not enough on its own: a
+# forked child inherits the parent's high-water mark, so a parent that has
+# imported pandas would put a floor under every stage's number.
+STAGE_LAUNCHER = """
+import atexit, os, resource, runpy, sys
+
+def report_peak():
+    try:
+        with open('/proc/self/status') as status:
+            peak = next(line.split()[1] for line in status if line.startswith('VmHWM'))
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(os.environ['STAGE_PEAK_FILE'], 'w') as out:
+        out.write(str(peak))
+
+atexit.register(report_peak)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+
+def run_stage(script, env, timeout):
+    """Run one stage in a child process; returns (status, seconds, peak_mb, error)."""
+    with tempfile.TemporaryFile() as stderr, tempfile.NamedTemporaryFile('r') as peak_file:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-c', STAGE_LAUNCHER, script], cwd=project_root,
+                                   env={**env, 'STAGE_PEAK_FILE': peak_file.name},
+                                   stdout=subprocess.DEVNULL, stderr=stderr)
+        deadline = start + timeout
+        while True:
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.perf_counter() > deadline:
+                process.kill()
+                _, status, usage = os.wait4(process.pid, 0)
+                process.returncode = -9
+                return 'timeout', time.perf_counter() - start, usage.ru_maxrss / 1024, ''
+            time.sleep(0.01)
+        seconds = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        # Both figures are in kilobytes on Linux
+        reported = peak_file.read().strip()
+        peak_mb = (int(reported) if reported else usage.ru_maxrss) / 1024
+        if process.returncode != 0:
+            stderr.seek(0)
+            error = stderr.read().decode(errors='replace').strip().splitlines()
+            return 'error', seconds, peak_mb, error[-1] if error else f'exit code {process.returncode}'
+        return 'ok', seconds, peak_mb, ''
+
+
+def run_tier(tier, events, stages, timeout, kills_per_round, players, seed):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        folders = {name: os.path.join(tmp, name) for name in ['raw', 'logs', 'data']}
+        for folder in folders.values():
+            os.makedirs(folder)
+        rounds = max(1, round(events / kills_per_round))
+        kills = generate_log(os.path.join(folders['raw'], 'synthetic.log'), players=players, rounds=rounds,
+                             kills_per_round=kills_per_round, seed=seed)
+        log_mb = os.path.getsize(os.path.join(folders['raw'], 'synthetic.log')) / 1024 ** 2
+        print(f"[{tier}] {kills} kill events, {rounds} rounds, {log_mb:.1f} MB log")
+
+        env = {
+            **os.environ,
+            'PYTHONPATH': str(project_root),
+            'RAW_DATA_FOLDER': folders['raw'],
+            'LOG_FOLDER': folders['logs'],
+            'PROCESSED_DATA_FOLDER': folders['data'],
+            'EVENT_STORE_PATH': os.path.join(folders['data'], 'events.db'),
+        }
+
+        total_seconds, total_peak, pipeline_status = 0.0, 0.0, 'ok'
+        for script in stages:
+            stage = Path(script).stem
+            if pipeline_status != 'ok':
+                rows.append({'tier': tier, 'events': kills, 'stage': stage, 'status': 'skipped',
+                             'seconds': '', 'peak_mb': '', 'error': ''})
+                continue
+            status, seconds, peak_mb, error = run_stage(script, env, timeout)
+            print(f"[{tier}] {stage:<45} {status:<8} {seconds:9.2f}s {peak_mb:9.1f} MB {error}")
+            rows.append({'tier': tier, 'events': kills, 'stage': stage, 'status': status,
+                         'seconds': round(seconds, 4), 'peak_mb': round(peak_mb, 1), 'error': error})
+            total_seconds += seconds
+            total_peak = max(total_peak, peak_mb)
+            # Later stages read this stage's output, so there is nothing left to measure
+            pipeline_status = status
+
+        rows.append({'tier': tier, 'events': kills, 'stage': 'pipeline', 'status': pipeline_status,
+                     'seconds': round(total_seconds, 4), 'peak_mb': round(total_peak, 1), 'error': ''})
+        print(f"[{tier}] {'pipeline':<45} {pipeline_status:<8} {total_seconds:9.2f}s {total_peak:9.1f} MB")
+    return rows
+
+
+def plot_curves(rows, path):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('Time (s)', 'Peak memory (MB)'))
+    for stage in dict.fromkeys(row['stage'] for row in rows):
+        points = [row for row in rows if row['stage'] == stage and row['status'] == 'ok']
+        if not points:
+            continue
+        x = [row['events'] for row in points]
+        fig.add_trace(go.Scatter(x=x, y=[row['seconds'] for row in points], mode='lines+markers',
+                                 name=stage, legendgroup=stage), row=1, col=1)
+        fig.add_trace(go.Scatter(x=x, y=[row['peak_mb'] for row in points], mode='lines+markers',
+                                 name=stage, legendgroup=stage, showlegend=False), row=1, col=2)
+    fig.update_xaxes(type='log', title_text='Kill events')
+    fig.update_yaxes(type='log')
+    fig.write_html(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure pipeline time and peak memory across log sizes.')
+    parser.add_argument('--tiers', default='small,medium', help=f"comma-separated, from {', '.join(TIERS)}")
+    parser.add_argument('--timeout', type=float, default=600, help='seconds before a stage is abandoned')
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--kills-per-round', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write one CSV row per tier and stage')
+    parser.add_argument('--plot', help='write time and memory curves to this HTML file')
+    args = parser.parse_args()
+
+    stages = pipeline_stages()
+
+    rows = []
+    for tier in args.tiers.split(','):
+        rows.extend(run_tier(tier, TIERS[tier], stages, args.timeout, args.kills_per_round, args.players, args.seed))
+
+    if args.output:
+        with open(args.output, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Results saved to {args.output}")
+    if args.plot:
+        plot_curves(rows, args.plot)
+        print(f"Curves saved to {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# Regression gate for the processes/ pipeline. Runs the stages on fixed
+# inputs and checks two things:
+#
+#   1. Every output matches its golden copy row by row. Values are compared
+#      after normalising dtypes (numbers as floats, everything else as text),
+#      so "1" vs "1.0" passes but a changed score, a dropped row or a
+#      reordered column does not.
+#   2. Each stage's wall time and peak memory stay within a tolerance of the
+#      stored baseline.
+#
+# Cases:
+#   session    the committed session log (processes/processed_logs), stages 4 onwards
+#   synthetic  a deterministic synthetic raw log with frequent suicides, all stages
+#
+# Usage:
+#   python benchmarks/regression_gate.py                      # check; exits 1 on any failure
+#   python benchmarks/regression_gate.py --skip-perf          # outputs only
+#   python benchmarks/regression_gate.py --update-golden      # after an intended output change
+#   python benchmarks/regression_gate.py --update-baselines   # after a speed-up, or on a new machine
+#
+# Timings depend on the machine; refresh the baselines where the gate runs.
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.pipeline_scaling import pipeline_stages, run_stage
+from benchmarks.synthetic_log import generate_log
+
+GOLDEN_FOLDER = project_root / 'benchmarks' / 'golden'
+BASELINES_PATH = project_root / 'benchmarks' / 'baselines' / 'regression_gate.json'
+
+# Relative tolerance plus an absolute allowance for process start-up noise
+TIME_TOLERANCE = 0.25
+TIME_SLACK_SECONDS = 0.5
+MEMORY_TOLERANCE = 0.20
+MEMORY_SLACK_MB = 20
+
+# Outputs that are folders of per-round files are compared as one table
+FOLDER_OUTPUTS = ['player_performance_per_round', 'player_performance_per_round_adjusted',
+                  'player_performance_metadata_summary']
+
+MAX_REPORTED_DIFFERENCES = 10
+
+
+def prepare_session(tmp):
+    return {'LOG_FOLDER': str(project_root / 'processes' / 'processed_logs')}, '4_create_df'
+
+
+def prepare_synthetic(tmp):
+    raw = os.path.join(tmp, 'raw')
+    logs = os.path.join(tmp, 'logs')
+    os.makedirs(raw)
+    os.makedirs(logs)
+    generate_log(os.path.join(raw, 'synthetic.log'), players=6, rounds=30, kills_per_round=40,
+                 suicide_rate=0.15, seed=7)
+    return {'RAW_DATA_FOLDER': raw, 'LOG_FOLDER': logs}, '1_start'
+
+
+CASES = {
+    'session': prepare_session,
+    'synthetic': prepare_synthetic,
+}
+
+
+def run_case(case, repeats, timeout):
+    """
+    Run the case's stages repeats times; returns (outputs, timings).
+
+    outputs maps output name -> DataFrame from the last run; timings maps
+    stage -> {'seconds': median, 'peak_mb': max}.
+    """
+    samples = {}
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as tmp:
+            folders, first_stage = CASES[case](tmp)
+            data = os.path.join(tmp, 'data')
+            os.makedirs(data)
+            # 1_start formats unix times in local time; pin it so outputs match anywhere
+            env = {**os.environ, 'PYTHONPATH': str(project_root), 'PROCESSED_DATA_FOLDER': data,
+                   'EVENT_STORE_PATH': os.path.join(data, 'events.db'), 'TZ': 'UTC', **folders}
+
+            stages = pipeline_stages()
+            stages = stages[[Path(script).stem for script in stages].index(first_stage):]
+            for script in stages:
+                status, seconds, peak_mb, error = run_stage(script, env, timeout)
+                if status != 'ok':
+                    raise RuntimeError(f"[{case}] {Path(script).stem} {status}: {error}")
+                samples.setdefault(Path(script).stem, []).append((seconds, peak_mb))
+            outputs = read_outputs(data)
+
+    timings = {stage: {'seconds': round(statistics.median(seconds for seconds, _ in values), 4),
+                       'peak_mb': round(max(peak for _, peak in values), 1)}
+               for stage, values in samples.items()}
+    return outputs, timings
+
+
+def read_outputs(folder):
+    outputs = {}
+    for path in sorted(glob.glob(os.path.join(folder, '*.csv'))):
+        outputs[Path(path).stem] = pd.read_csv(path, dtype=str, keep_default_na=False)
+    for name in FOLDER_OUTPUTS:
+        files = sorted(glob.glob(os.path.join(folder, name, '*.csv')))
+        if files:
+            frames = [pd.read_csv(path, dtype=str, keep_default_na=False).assign(source_file=Path(path).name)
+                      for path in files]
+            outputs[name] = pd.concat(frames, ignore_index=True)
+    store = os.path.join(folder, 'events.db')
+    if os.path.exists(store):
+        conn = sqlite3.connect(store)
+        try:
+            tables = [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+            for table in sorted(tables):
+                frame = pd.read_sql_query(f'SELECT * FROM {table}', conn)
+                outputs[f'events_db_{table}'] = frame.astype(str).where(frame.notna(), '')
+        finally:
+            conn.close()
+    return outputs
+
+
+def normalise(frame):
+    """Numbers as float64, everything else as stripped text; empty means missing."""
+    frame = frame.copy()
+    for column in frame.columns:
+        values = frame[column].astype(str).str.strip()
+        present = ~values.isin(['', 'nan', 'None'])
+        numeric = pd.to_numeric(values.where(present), errors='coerce')
+        if numeric[present].notna().all():
+            frame[column] = numeric.astype('float64')
+        else:
+            frame[column] = values.where(present, None)
+    return frame.reset_index(drop=True)
+
+
+def _show(value):
+    return repr(value.item() if hasattr(value, 'item') else value)
+
+
+def compare_frames(golden, actual):
+    """Return a list of human-readable differences (empty when equivalent)."""
+    if list(golden.columns) != list(actual.columns):
+        return [f"columns differ: golden {list(golden.columns)}, actual {list(actual.columns)}"]
+    differences = []
+    if len(golden) != len(actual):
+        differences.append(f"row count differs: golden {len(golden)}, actual {len(actual)}")
+
+    golden, actual = normalise(golden), normalise(actual)
+    rows = min(len(golden), len(actual))
+    for column in golden.columns:
+        expected = golden[column].iloc[:rows]
+        observed = actual[column].iloc[:rows]
+        if expected.dtype == 'float64' and observed.dtype == 'float64':
+            both_missing = expected.isna() & observed.isna()
+            close = (expected - observed).abs() <= 1e-9 * observed.abs().clip(lower=1)
+            mismatched = ~(both_missing | close.fillna(False))
+        else:
+            mismatched = ~((expected.isna() & observed.isna()) |
+                           (expected.astype(str) == observed.astype(str)))
+        for row in mismatched[mismatched].index[:MAX_REPORTED_DIFFERENCES]:
+            differences.append(f"row {row}, column {column}: golden {_show(expected[row])}, actual {_show(observed[row])}")
+        if len(differences) >= MAX_REPORTED_DIFFERENCES:
+            differences.append('...')
+            break
+    return differences
+
+
+def golden_path(case, name):
+    return GOLDEN_FOLDER / case / f'{name}.csv.gz'
+
+
+def check_outputs(case, outputs):
+    failures = []
+    expected_names = {path.name[:-len('.csv.gz')] for path in (GOLDEN_FOLDER / case).glob('*.csv.gz')}
+    if not expected_names:
+        return [f"[{case}] no golden outputs; run with --update-golden first"]
+    for name in sorted(expected_names | set(outputs)):
+        if name not in outputs:
+            failures.append(f"[{case}] {name}: missing from this run")
+            continue
+        if name not in expected_names:
+            failures.append(f"[{case}] {name}: new output without a golden copy")
+            continue
+        golden = pd.read_csv(golden_path(case, name), dtype=str, keep_default_na=False)
+        for difference in compare_frames(golden, outputs[name]):
+            failures.append(f"[{case}] {name}: {difference}")
+    return failures
+
+
+def save_golden(case, outputs):
+    folder = GOLDEN_FOLDER / case
+    folder.mkdir(parents=True, exist_ok=True)
+    for path in folder.glob('*.csv.gz'):
+        path.unlink()
+    for name, frame in outputs.items():
+        # mtime=0 keeps the gzip bytes identical when the content is
+        frame.to_csv(golden_path(case, name), index=False, compression={'method': 'gzip', 'mtime': 0})
+
+
+def check_timings(case, timings, baselines, time_tolerance, memory_tolerance):
+    failures = []
+    baseline = baselines.get(case)
+    if not baseline:
+        return [f"[{case}] no timing baseline; run with --update-baselines first"]
+    for stage, measured in timings.items():
+        expected = baseline.get(stage)
+        if expected is None:
+            print(f"  {stage:<45} no baseline")
+            continue
+        time_limit = expected['seconds'] * (1 + time_tolerance) + TIME_SLACK_SECONDS
+        memory_limit = expected['peak_mb'] * (1 + memory_tolerance) + MEMORY_SLACK_MB
+        verdict = 'ok'
+        if measured['seconds'] > time_limit:
+            verdict = 'SLOWER'
+            failures.append(f"[{case}] {stage}: {measured['seconds']:.2f}s vs baseline {expected['seconds']:.2f}s "
+                            f"(limit {time_limit:.2f}s)")
+        if measured['peak_mb'] > memory_limit:
+            verdict = 'MORE MEMORY' if verdict == 'ok' else verdict + ', MORE MEMORY'
+            failures.append(f"[{case}] {stage}: {measured['peak_mb']:.0f} MB vs baseline {expected['peak_mb']:.0f} MB "
+                            f"(limit {memory_limit:.0f} MB)")
+        print(f"  {stage:<45} {measured['seconds']:7.2f}s (base {expected['seconds']:6.2f}s) "
+              f"{measured['peak_mb']:7.0f} MB (base {expected['peak_mb']:5.0f} MB)  {verdict}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check pipeline outputs and performance against stored baselines.')
+    parser.add_argument('--cases', default=','.join(CASES))
+    parser.add_argument('--repeats', type=int, default=3, help='runs per case; timings use the median')
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument('--skip-outputs', action='store_true')
+    parser.add_argument('--skip-perf', action='store_true')
+    parser.add_argument('--update-golden', action='store_true')
+    parser.add_argument('--update-baselines', action='store_true')
+    args = parser.parse_args()
+
+    baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    failures = []
+    for case in args.cases.split(','):
+        repeats = 1 if args.skip_perf and not args.update_baselines else args.repeats
+        print(f"== {case} ({repeats} run(s))")
+        outputs, timings = run_case(case, repeats, args.timeout)
+
+        if args.update_golden:
+            save_golden(case, outputs)
+            print(f"  golden outputs updated ({len(outputs)} tables)")
+        elif not args.skip_outputs:
+            case_failures = check_outputs(case, outputs)
+            print(f"  outputs: {'equivalent' if not case_failures else f'{len(case_failures)} difference(s)'}")
+            failures.extend(case_failures)
+
+        if args.update_baselines:
+            baselines[case] = timings
+            print("  timing baseline updated")
+        elif not args.skip_perf:
+            failures.extend(check_timings(case, timings, baselines, args.time_tolerance, args.memory_tolerance))
+
+    if args.update_baselines:
+        BASELINES_PATH.parent.mkdir(parents=True, exist_ok=True)
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2) + '\n')
+
+    if failures:
+        print(f"\nFAILED ({len(failures)}):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nPASSED")
+
+
+if __name__ == "__main__":
+    main()
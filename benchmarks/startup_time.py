@@ -0,0 +1,90 @@
+# Measures dashboard cold start: each sample runs app/zeta.py once (the Home
+# page) in a fresh Python process through Streamlit's AppTest, and records the
+# wall time and which heavy libraries ended up imported.
+#
+# Usage:
+#   python benchmarks/startup_time.py                   # current tree
+#   python benchmarks/startup_time.py --compare HEAD~1  # also measure another revision
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ['statsmodels', 'scipy', 'plotly', 'pytz', 'altair', 'pyarrow']
+
+# Runs inside the fresh interpreter
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('app/zeta.py', default_timeout=120)
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'seconds': elapsed,
+    'exceptions': [e.value for e in at.exception],
+    'loaded': [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def measure(tree, repeats):
+    samples = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE % HEAVY_MODULES],
+            cwd=tree, capture_output=True, text=True,
+            env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Startup probe failed in {tree}:\n{result.stderr}")
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def summarize(label, samples):
+    seconds = [sample['seconds'] for sample in samples]
+    print(f"{label}:")
+    print(f"  median {statistics.median(seconds):.3f}s, min {min(seconds):.3f}s, max {max(seconds):.3f}s over {len(seconds)} runs")
+    print(f"  heavy modules loaded at startup: {', '.join(samples[-1]['loaded']) or 'none'}")
+    if samples[-1]['exceptions']:
+        print(f"  exceptions: {samples[-1]['exceptions']}")
+    return statistics.median(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure dashboard cold-start time.')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--compare', metavar='REV', help='git revision to measure as the baseline')
+    args = parser.parse_args()
+
+    current = summarize('Working tree', measure(project_root, args.repeats))
+
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = os.path.join(tmp, 'baseline')
+            subprocess.run(['git', 'worktree', 'add', '--detach', worktree, args.compare],
+                           cwd=project_root, check=True, capture_output=True)
+            try:
+                # Processed data is not always committed; reuse the working tree's copy
+                for folder in ['final-data', 'app/import']:
+                    target = Path(worktree, folder)
+                    if not target.exists():
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        target.symlink_to(project_root / folder)
+                baseline = summarize(f'Baseline ({args.compare})', measure(worktree, args.repeats))
+            finally:
+                subprocess.run(['git', 'worktree', 'remove', '--force', worktree],
+                               cwd=project_root, capture_output=True)
+        print(f"Speed-up: {baseline / current:.2f}x ({baseline - current:+.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Deterministic generator for per-player activity files in the format the
+# Analysis page reads from ACTIVITY_FOLDER: {ip}_activity_data.csv with an
+# epoch-seconds timestamp and cumulative mouse_clicks, SPACE, A, W, S and D
+# counters. The default rate of 1000 samples per second gives about 150 MB for
+# an hour-long session, the size of the real recordings.
+#
+# Files can be lined up with a processed game log (player IPs and the session
+# span come from player_performance.csv, players are busier during rounds) or
+# generated for an arbitrary span.
+#
+# Usage:
+#   python benchmarks/synthetic_activity.py out/ --data final-data
+#   python benchmarks/synthetic_activity.py out/ --players 10.0.0.1,10.0.0.2 --start 1725501194 --minutes 60
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+INPUT_COLUMNS = ['mouse_clicks', 'SPACE', 'A', 'W', 'S', 'D']
+
+# Mean presses per second while a player is actively playing
+ACTIVE_RATES = {'mouse_clicks': 3.0, 'SPACE': 0.8, 'A': 1.2, 'W': 2.0, 'S': 0.5, 'D': 1.2}
+# Share of the active rate between rounds
+IDLE_FACTOR = 0.05
+
+SAMPLE_RATE_HZ = 1000
+CHUNK_SECONDS = 300
+
+
+def session_from_log(player_performance, padding=60):
+    """
+    Player IPs, session span and in-round intervals from a processed log.
+
+    Naive log timestamps are taken as UTC, which is how the Analysis page
+    lines them up with the activity epochs.
+    """
+    timestamps = pd.to_datetime(player_performance['timestamp'])
+    epoch = timestamps.dt.tz_localize('UTC').astype('int64') / 1e9 if timestamps.dt.tz is None \
+        else timestamps.astype('int64') / 1e9
+    names = pd.unique(pd.concat([player_performance['killer_ip'], player_performance['victim_ip']]).dropna())
+    ips = [name.split('_', 1)[1] for name in names if str(name).startswith('Player_') and name != 'Player_']
+    rounds = epoch.groupby(player_performance['game_round']).agg(['min', 'max'])
+    return ips, epoch.min() - padding, epoch.max() + padding, list(rounds.itertuples(index=False, name=None))
+
+
+def _intensity(seconds, rounds, rng):
+    # Per-second activity level: busy inside rounds, nearly idle between them,
+    # with slow random variation in how hard the player is pushing
+    if rounds:
+        in_round = np.zeros(len(seconds), dtype=bool)
+        for start, end in rounds:
+            in_round |= (seconds >= start) & (seconds <= end)
+        level = np.where(in_round, 1.0, IDLE_FACTOR)
+    else:
+        level = np.ones(len(seconds))
+    return level * rng.lognormal(mean=0.0, sigma=0.4, size=len(seconds))
+
+
+def generate_activity(path, start, end, rounds=None, sample_rate=SAMPLE_RATE_HZ, seed=0):
+    """
+    Write one activity file covering [start, end) epoch seconds; returns the row count.
+
+    Presses are Bernoulli draws per sample with the per-second intensity
+    applied, accumulated into the cumulative counters the recorder stores.
+    Written in chunks so memory stays flat for long sessions.
+    """
+    rng = np.random.default_rng(seed)
+    totals = np.zeros(len(INPUT_COLUMNS), dtype=np.int64)
+    rows = 0
+    writer = None
+    # Arrow always quotes the header; write a plain one like the recorder does
+    file = open(path, 'wb')
+    file.write((','.join(['timestamp'] + INPUT_COLUMNS) + '\n').encode())
+    try:
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + CHUNK_SECONDS, end)
+            n = int(round((chunk_end - chunk_start) * sample_rate))
+            if n == 0:
+                break
+            timestamps = chunk_start + np.arange(n) / sample_rate
+            seconds = np.floor(timestamps)
+            unique_seconds, inverse = np.unique(seconds, return_inverse=True)
+            intensity = _intensity(unique_seconds, rounds, rng)[inverse]
+
+            columns = {'timestamp': pa.array(np.round(timestamps, 3))}
+            for i, column in enumerate(INPUT_COLUMNS):
+                presses = rng.random(n) < ACTIVE_RATES[column] * intensity / sample_rate
+                counter = np.cumsum(presses, dtype=np.int64) + totals[i]
+                totals[i] = counter[-1]
+                columns[column] = pa.array(counter)
+            table = pa.table(columns)
+
+            if writer is None:
+                writer = pv.CSVWriter(file, table.schema, write_options=pv.WriteOptions(include_header=False))
+            writer.write_table(table)
+            rows += n
+            chunk_start = chunk_end
+    finally:
+        if writer is not None:
+            writer.close()
+        file.close()
+    return rows
+
+
+def generate_for_players(folder, ips, start, end, rounds=None, sample_rate=SAMPLE_RATE_HZ, seed=0):
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+    for offset, ip in enumerate(ips):
+        path = os.path.join(folder, f'{ip}_activity_data.csv')
+        generate_activity(path, start, end, rounds, sample_rate, seed + offset)
+        paths[ip] = path
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic per-player activity files.')
+    parser.add_argument('folder')
+    parser.add_argument('--data', help='processed data folder whose player_performance.csv the files line up with')
+    parser.add_argument('--players', help='comma-separated IPs (without --data)')
+    parser.add_argument('--start', type=float, help='session start, epoch seconds (without --data)')
+    parser.add_argument('--minutes', type=float, default=60, help='session length (without --data)')
+    parser.add_argument('--sample-rate', type=float, default=SAMPLE_RATE_HZ)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.data:
+        player_performance = pd.read_csv(os.path.join(args.data, 'player_performance.csv'))
+        ips, start, end, rounds = session_from_log(player_performance)
+    else:
+        if not args.players or args.start is None:
+            parser.error('either --data or both --players and --start are required')
+        ips, start, end, rounds = args.players.split(','), args.start, args.start + args.minutes * 60, None
+
+    paths = generate_for_players(args.folder, ips, start, end, rounds, args.sample_rate, args.seed)
+    for ip, path in paths.items():
+        print(f"{ip}: {os.path.getsize(path) / 1024 ** 2:.1f} MB -> {path}")
+
+
+if __name__ == "__main__":
+    main()
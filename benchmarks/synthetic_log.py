@@ -0,0 +1,162 @@
+# Deterministic generator for raw game-server logs in the format the pipeline
+# reads from RAW_DATA_FOLDER: one "<unix time>: b'...'" line per network read,
+# with Kill / PlayerScore / Challenge / Award events packed into the same
+# line, map loads, "Network egress latency" lines and unrelated server noise.
+#
+# Usage:
+#   python benchmarks/synthetic_log.py app/synthetic.log --events 100000
+#   python benchmarks/synthetic_log.py out.log --players 8 --rounds 50 --suicide-rate 0.1
+
+import argparse
+import random
+
+WORLD_ID = 1022
+
+# Means of death with the ids the server logs them under
+WEAPONS = [
+    (1, 'MOD_SHOTGUN'),
+    (3, 'MOD_MACHINEGUN'),
+    (4, 'MOD_GRENADE'),
+    (5, 'MOD_GRENADE_SPLASH'),
+    (6, 'MOD_ROCKET'),
+    (7, 'MOD_ROCKET_SPLASH'),
+    (8, 'MOD_PLASMA'),
+    (9, 'MOD_PLASMA_SPLASH'),
+    (10, 'MOD_RAILGUN'),
+    (11, 'MOD_LIGHTNING'),
+]
+SELF_KILL_WEAPONS = [(5, 'MOD_GRENADE_SPLASH'), (7, 'MOD_ROCKET_SPLASH'), (9, 'MOD_PLASMA_SPLASH')]
+WORLD_WEAPONS = [(19, 'MOD_FALLING'), (20, 'MOD_SUICIDE'), (22, 'MOD_TRIGGER_HURT')]
+AWARDS = ['EXCELLENT', 'IMPRESSIVE', 'GAUNTLET']
+ITEMS = ['item_armor_shard', 'item_health', 'ammo_shells', 'ammo_bullets', 'weapon_shotgun', 'weapon_rocketlauncher']
+
+DEFAULT_MAPS = ['aggressor', 'wrackdm17']
+DEFAULT_LATENCIES = [0, 50, 100, 150, 200]
+
+# Packed events inside a line are separated by a literal "\n]" and prefixed
+# with a literal "\x08 \x08", exactly as the server's repr()'d reads appear
+SEP = '\\n]'
+PREFIX = '\\x08 \\x08'
+
+
+def player_name(index):
+    return f'Player_10.0.{index // 256}.{index % 256}'
+
+
+def _line(timestamp, events):
+    return f"{timestamp:.6f}: b'" + ''.join(f'{PREFIX}{event}{SEP}' for event in events) + "'\n"
+
+
+def _map_load(map_name, players):
+    events = [
+        '------------ Map Loading ------------',
+        f'trying to load maps/{map_name}.aas',
+        f'loaded maps/{map_name}.aas',
+        'AAS initialized.',
+    ]
+    for client, name in enumerate(players):
+        events.append(f'ClientUserinfoChanged: {client} n\\\\{name}\\\\t\\\\0\\\\model\\\\sarge')
+        events.append(f'ClientBegin: {client}')
+    return events
+
+
+def generate_log(path, players=4, rounds=14, maps=DEFAULT_MAPS, latencies=DEFAULT_LATENCIES,
+                 kills_per_round=40, suicide_rate=0.05, event_density=0.3, multi_kill_rate=0.1,
+                 award_rate=0.05, noise_rate=0.5, break_map='kaos2', rounds_per_latency=2,
+                 start_time=1725501194.0, seed=0):
+    """
+    Write a synthetic raw log to path and return the number of kill events.
+
+    Rounds cycle through maps; every rounds_per_latency rounds the latency
+    changes, preceded by a short break round on break_map (None to disable),
+    like the real sessions. suicide_rate is the share of kills that are world
+    or self kills, event_density the mean number of kill packets per second,
+    and multi_kill_rate the chance a packet carries a second kill.
+    """
+    rng = random.Random(seed)
+    names = [player_name(index) for index in range(players)]
+    timestamp = start_time
+    kills = 0
+
+    with open(path, 'w') as log:
+        for round_index in range(rounds):
+            if round_index % rounds_per_latency == 0:
+                latency = latencies[(round_index // rounds_per_latency) % len(latencies)]
+                if break_map:
+                    log.write(_line(timestamp, _map_load(break_map, names)))
+                    log.write(f'{timestamp:.6f}: Network egress latency: {latency} ms\n')
+                    timestamp += 10
+            map_name = maps[round_index % len(maps)]
+            log.write(_line(timestamp, _map_load(map_name, names)))
+            log.write(f'{timestamp:.6f}: Network egress latency: {latency} ms\n')
+
+            scores = [0] * players
+            round_kills = 0
+            while round_kills < kills_per_round:
+                timestamp += rng.expovariate(event_density)
+                events = []
+                for _ in range(2 if rng.random() < multi_kill_rate else 1):
+                    victim = rng.randrange(players)
+                    if rng.random() < suicide_rate:
+                        if rng.random() < 0.5:
+                            killer, (weapon_id, weapon) = WORLD_ID, rng.choice(WORLD_WEAPONS)
+                            killer_name = '<world>'
+                        else:
+                            killer, (weapon_id, weapon) = victim, rng.choice(SELF_KILL_WEAPONS)
+                            killer_name = names[victim]
+                        # The pipeline's PlayerScore pattern only matches non-negative scores
+                        scores[victim] = max(scores[victim] - 1, 0)
+                        scored = victim
+                    else:
+                        killer = rng.choice([index for index in range(players) if index != victim] or [victim])
+                        weapon_id, weapon = rng.choice(WEAPONS)
+                        killer_name = names[killer]
+                        scores[killer] += 1
+                        scored = killer
+                    events.append(f'Kill: {killer} {victim} {weapon_id}: {killer_name} killed {names[victim]} by {weapon}')
+                    events.append(f'PlayerScore: {scored} {scores[scored]}: {names[scored]} now has {scores[scored]} points')
+                    if killer != WORLD_ID and killer != victim:
+                        events.append(f'Challenge: {killer} 202 1: Client {killer} got award 202')
+                        if rng.random() < award_rate:
+                            award = rng.randrange(len(AWARDS))
+                            events.append(f'Award: {killer} {award + 1}: {names[killer]} gained the {AWARDS[award]} award!')
+                    round_kills += 1
+                log.write(_line(timestamp, events))
+
+                if rng.random() < noise_rate:
+                    client = rng.randrange(players)
+                    log.write(_line(timestamp, [f'Item: {client} {rng.choice(ITEMS)}' for _ in range(rng.randint(1, 4))]))
+
+            kills += round_kills
+            timestamp += 15
+    return kills
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic raw game-server log.')
+    parser.add_argument('path')
+    parser.add_argument('--events', type=int, help='approximate number of kill events (overrides --rounds)')
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=14)
+    parser.add_argument('--maps', default=','.join(DEFAULT_MAPS))
+    parser.add_argument('--latencies', default=','.join(map(str, DEFAULT_LATENCIES)))
+    parser.add_argument('--kills-per-round', type=int, default=40)
+    parser.add_argument('--suicide-rate', type=float, default=0.05)
+    parser.add_argument('--event-density', type=float, default=0.3, help='kill packets per second')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rounds = args.rounds
+    if args.events:
+        rounds = max(1, round(args.events / args.kills_per_round))
+    kills = generate_log(
+        args.path, players=args.players, rounds=rounds, maps=args.maps.split(','),
+        latencies=[int(value) for value in args.latencies.split(',')],
+        kills_per_round=args.kills_per_round, suicide_rate=args.suicide_rate,
+        event_density=args.event_density, seed=args.seed,
+    )
+    print(f"Wrote {kills} kill events over {rounds} rounds to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
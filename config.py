@@ -13,6 +13,39 @@ IMPORT_FOLDER = os.getenv('IMPORT_FOLDER', 'app/import')
 RULES_PATH = os.getenv('RULES_PATH', 'sidebar/demographic')
 ACTIVITY_FOLDER = os.getenv('ACTIVITY_FOLDER', 'app/import/activity_data')
 
+# Memory budget for activity data kept resident by the Analysis page
+ACTIVITY_CACHE_MAX_MB = int(os.getenv('ACTIVITY_CACHE_MAX_MB', '1024'))
+
+# Converted, time-indexed copies of the activity files and their catalog. The
+# folder is watched for new files; without the watchdog package it is polled.
+ACTIVITY_STORE_FOLDER = os.getenv('ACTIVITY_STORE_FOLDER', '.cache/activity')
+ACTIVITY_POLL_SECONDS = float(os.getenv('ACTIVITY_POLL_SECONDS', '5'))
+
+# Fitted model summaries shared across reruns and sessions
+MODEL_CACHE_FOLDER = os.getenv('MODEL_CACHE_FOLDER', '.cache/models')
+MODEL_CACHE_MAX_MB = int(os.getenv('MODEL_CACHE_MAX_MB', '256'))
+
+# Background job pool for heavy analyses
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', str(os.cpu_count() or 2)))
+JOB_HISTORY = int(os.getenv('JOB_HISTORY', '50'))
+
+# Logs uploaded or dropped into IMPORT_FOLDER are processed in the background.
+# Runs build their outputs in the staging folder, which must be on the same
+# file system as PROCESSED_DATA_FOLDER so they can be renamed into place.
+INGEST_POLL_SECONDS = float(os.getenv('INGEST_POLL_SECONDS', '2'))
+INGEST_STAGING_FOLDER = os.getenv('INGEST_STAGING_FOLDER', '.cache/ingest')
+
+# SQLite copy of the processed events for ad-hoc queries, written by
+# processes/15_event_store.py. The dashboard reads EVENT_STORE_FILE in the
+# data folder it serves (utils/event_store.connect).
+EVENT_STORE_FILE = 'events.db'
+EVENT_STORE_PATH = os.getenv('EVENT_STORE_PATH', os.path.join(PROCESSED_DATA_FOLDER, EVENT_STORE_FILE))
+
+# Per-page render timings: rolling log, and the developer panel in the sidebar
+PAGE_TIMINGS_LOG = os.getenv('PAGE_TIMINGS_LOG', '.cache/page_timings.log')
+PAGE_TIMINGS_LOG_MB = int(os.getenv('PAGE_TIMINGS_LOG_MB', '5'))
+DEV_PANEL = os.getenv('DEV_PANEL', '0') == '1'
+
 # Store them in a dictionary (optional, if you need dynamic access)
 FOLDER_PATHS = {
     'LOG_FOLDER': LOG_FOLDER,
@@ -0,0 +1,25 @@
+import pandas as pd
+from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER
+from utils.player_stats import build_player_round_stats, build_player_stats
+
+# Materialise the per-player and per-(player, round) statistics shown in the
+# Player Performance report, so the page only has to read them
+
+input_path = f'{PROCESSED_DATA_FOLDER}/player_performance.csv'  # path
+summary_path = f'{PROCESSED_DATA_FOLDER}/round_summary_adjusted.csv'  # path
+round_stats_path = f'{PROCESSED_DATA_FOLDER}/player_round_stats.csv'  # path
+player_stats_path = f'{PROCESSED_DATA_FOLDER}/player_stats.csv'  # path
+
+# Read the CSV files
+df = pd.read_csv(input_path)
+sb = pd.read_csv(summary_path)
+
+round_stats = build_player_round_stats(df, sb)
+player_stats = build_player_stats(round_stats)
+
+# Save the statistics
+round_stats.to_csv(round_stats_path, index=False)
+player_stats.to_csv(player_stats_path, index=False)
+
+print(f"Per-round player statistics saved to {round_stats_path}")
+print(f"Player statistics saved to {player_stats_path}")
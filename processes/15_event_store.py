@@ -0,0 +1,21 @@
+import pandas as pd
+from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER, EVENT_STORE_PATH
+from utils.event_store import publish
+from utils.players import load_player_dictionary
+
+# Publish the cleaned events, round scoreboards and kill edges into an indexed
+# SQLite database so they can be queried without loading whole CSVs
+
+events_path = f'{PROCESSED_DATA_FOLDER}/ignore_suicides.csv'  # path
+summary_path = f'{PROCESSED_DATA_FOLDER}/round_summary_adjusted.csv'  # path
+
+# Read the CSV files
+events = pd.read_csv(events_path)
+scoreboards = pd.read_csv(summary_path)
+players = load_player_dictionary()
+
+counts = publish(events, scoreboards, players, EVENT_STORE_PATH)
+
+for table, rows in counts.items():
+    print(f"{table}: {rows} rows")
+print(f"Event store saved to {EVENT_STORE_PATH}")
@@ -0,0 +1,11 @@
+import os
+from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER
+from utils.datasets import DATASETS, publish_arrow_dataset
+
+# Publish the datasets the dashboard reads as Arrow IPC files, which the app
+# memory-maps once per process instead of parsing the CSVs
+
+for name in DATASETS:
+    path = publish_arrow_dataset(name)
+    print(f"{name}: {os.path.getsize(path) / 1024:.0f} KB -> {path}")
+print(f"Arrow datasets saved to {PROCESSED_DATA_FOLDER}")
@@ -1,5 +1,6 @@
 import pandas as pd
 from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER
+from utils.players import build_player_dictionary, save_player_dictionary, player_dictionary_path
 import re
 
 input_path = f'{LOG_FOLDER}/start_again_twice.log' ##path
@@ -103,4 +104,10 @@ df = pd.DataFrame(data)
 # Save the DataFrame to the specified CSV file path
 df.to_csv(output_path, index=False)
 
+# Assign every player name seen in the log a dense integer code; later stages
+# and the dashboard encode their player columns against this dictionary
+players = build_player_dictionary(df)
+save_player_dictionary(players)
+print(f"Player dictionary with {len(players)} players saved to {player_dictionary_path()}")
+
 output_path
@@ -1,11 +1,13 @@
 import pandas as pd
 from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER
+from utils.players import encode_players, load_player_dictionary
 
 input_path = f'{PROCESSED_DATA_FOLDER}/remove_break_rounds.csv'
 output_path = f'{PROCESSED_DATA_FOLDER}/no_blanks.csv'
 
-# Read the CSV file
-df = pd.read_csv(input_path)
+# Read the CSV file; player columns as integer codes so the lookups below
+# compare codes instead of strings
+df = encode_players(pd.read_csv(input_path), load_player_dictionary())
 
 # Function to fill missing values for a row
 def fill_missing_values(row, previous_rows):
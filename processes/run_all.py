@@ -1,5 +1,7 @@
 import subprocess
 from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER
+from utils.datasets import serve_processed_folder
+from utils.pipeline import PIPELINE_SCRIPTS
 
 # Print each directory
 print(f"Logs Directory: {LOG_FOLDER}")
@@ -18,21 +20,7 @@ for folder in [LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER]:
     else:
         print(f"Directory '{path}' already exists.")
 
-scripts = [
-    "processes/1_start.py",
-    "processes/2_separate.py",
-    "processes/3_merge.py",
-    "processes/4_create_df.py",
-    "processes/5_remove_break_rounds.py",
-    "processes/6_no_blanks.py",
-    "processes/7_player_performance_per_round.py",
-    "processes/8_round_score_summary.py",
-    "processes/9_ignore_suicides.py",
-    "processes/10_player_performance_per_round_adjusted.py",
-    "processes/11_round_score_summary_after_adjusted.py",
-    "processes/12_additional_counters.py",
-    "processes/13_additional_counters_round_summary.py"
-]
+scripts = PIPELINE_SCRIPTS
 
 for script in scripts:
     print(f"Running {script}...")
@@ -41,4 +29,8 @@ for script in scripts:
         print(f"Error running {script}: {result.stderr}")
     else:
         print(f"{script} completed successfully.")
-    print(result.stdout)
\ No newline at end of file
+    print(result.stdout)
+
+# Outputs published by the app's ingest service take precedence until the
+# dashboard is pointed back at the ones this run wrote
+serve_processed_folder()
@@ -7,32 +7,107 @@ from plotly.subplots import make_subplots
 from scipy import stats
 from datetime import datetime, timedelta
 import pytz
-import statsmodels.api as sm
-from statsmodels.formula.api import poisson
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
-from scipy.stats import chisquare, anderson_ksamp
+import contextvars
 import gc
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.activity_cache import get_activity_cache
+from utils.activity_store import ROLLUPS, get_activity_watcher
+from utils.datasets import get_dataset
+from utils.downsample import MAX_POINTS, cdf_points, lttb, qq_points, scatter
+from utils.event_windows import player_events, event_activity_features
+from utils.jobs import get_job_manager
+from utils.model_cache import fingerprint
+from utils.ui import fragment
+from sidebar.analysis.stat_tests import run_analyses
+
+# Function to create frequency data
+def create_frequency_data(data, columns, start_time):
+    data = data.sort_values('timestamp')
+    date_range = pd.date_range(start=start_time, periods=600, freq='s')
+    freq_data = pd.DataFrame({'timestamp': date_range})
+    
+    def get_last_value(group):
+        return group.iloc[-1] if len(group) > 0 else 0
+
+    for column in columns:
+        grouped = data.groupby(data['timestamp'].dt.floor('S'))[column].apply(get_last_value)
+        full_range = pd.date_range(start=grouped.index.min(), end=grouped.index.max(), freq='S')
+        filled_data = grouped.reindex(full_range).ffill().reset_index()
+        freq_data = pd.merge(freq_data, filled_data, left_on='timestamp', right_on='index', how='left')
+        freq_data[column] = freq_data[column].ffill().fillna(0)
+        freq_data = freq_data.drop('index', axis=1)
+
+    for column in columns:
+        freq_data[f'{column}_diff'] = freq_data[column].diff().fillna(0)
+    
+    return freq_data
+
+def clean_data(df, selected_column):
+    # Remove infinite values
+    df = df[~np.isinf(df[f'{selected_column}_diff'])]
+    
+    # Convert to numeric, coercing errors to NaN
+    df[f'{selected_column}_diff'] = pd.to_numeric(df[f'{selected_column}_diff'], errors='coerce')
+    
+    # Remove NaN values
+    df = df.dropna(subset=[f'{selected_column}_diff'])
+    
+    return df
+
+def activity_window(activity, start, end, tz):
+    # Filter on the raw epoch seconds and only convert the window to local time
+    epoch = activity['timestamp']
+    period_data = activity[(epoch >= start.timestamp()) & (epoch <= end.timestamp())].copy()
+    period_data['timestamp'] = pd.to_datetime(period_data['timestamp'], unit='s', utc=True).dt.tz_convert(tz)
+    return period_data
+
+def timeline_level(span, max_points=MAX_POINTS):
+    # The finest rollup that draws span seconds in at most max_points buckets;
+    # the coarsest one when none does
+    for name, seconds in ROLLUPS.items():
+        if span / seconds <= max_points:
+            return name
+    return list(ROLLUPS)[-1]
+
+def activity_timeline(ip_address, start, end, columns, max_points=MAX_POINTS):
+    """
+    Presses per second of each column between start and end (epoch seconds),
+    from the rollup level picked for the span. Returns the level and a frame
+    with one row per bucket, stamped with the bucket start.
+    """
+    level = timeline_level(end - start, max_points)
+    rollup = get_activity_cache().get_table((ip_address, level))
+    timestamps = rollup['timestamp'].to_numpy()
+    # Include the bucket before the range, so the first visible bucket has a difference
+    first = max(int(np.searchsorted(timestamps, start, side='left')) - 1, 0)
+    stop = int(np.searchsorted(timestamps, end, side='right'))
+    window = rollup.slice(first, max(stop - first, 0)).to_pandas()
+
+    # Buckets without samples are missing, so divide by the time between the
+    # buckets that are there rather than by the bucket length
+    times = window['timestamp'].to_numpy(dtype=float)
+    elapsed = np.diff(times)
+    timeline = pd.DataFrame({'timestamp': times[1:]})
+    for column in columns:
+        timeline[column] = np.diff(window[column].to_numpy(dtype=float)) / elapsed
+    return level, timeline
 
 def show_analysis():
 
     # Load the datasets
-    @st.cache_data
     def load_data():
         try:
-            player_performance = pd.read_csv(f'{PROCESSED_DATA_FOLDER}/player_performance.csv', parse_dates=['timestamp'])
-            return player_performance
+            return get_dataset('player_performance')
         except Exception as e:
             st.error(f"Error loading the player performance data: {str(e)}")
             return None
 
-    @st.cache_data
-    def load_mouse_data(ip_address):
-        try:
-            filename = f'app/import/activity_data/{ip_address}_activity_data.csv'
-            return pd.read_csv(filename)
-        except Exception as e:
-            st.error(f"Error loading the mouse movement data for IP {ip_address}: {str(e)}")
-            return None
+    # Activity files are too large for st.cache_data, which keeps every IP
+    # forever and copies the frame on each hit; use the bounded LRU cache.
+    # Runs on worker threads, so errors are raised rather than sent to st.error
+    def load_mouse_data(key):
+        return get_activity_cache().get(key)
 
     player_performance = load_data()
 
@@ -55,113 +130,219 @@ def show_analysis():
         # Convert timestamps for player performance data
         player_performance['timestamp'] = player_performance['timestamp'].apply(to_aest)
 
-        # Function to create frequency data
-        def create_frequency_data(data, columns, start_time):
-            data = data.sort_values('timestamp')
-            date_range = pd.date_range(start=start_time, periods=600, freq='s')
-            freq_data = pd.DataFrame({'timestamp': date_range})
-            
-            def get_last_value(group):
-                return group.iloc[-1] if len(group) > 0 else 0
-
-            for column in columns:
-                grouped = data.groupby(data['timestamp'].dt.floor('S'))[column].apply(get_last_value)
-                full_range = pd.date_range(start=grouped.index.min(), end=grouped.index.max(), freq='S')
-                filled_data = grouped.reindex(full_range).ffill().reset_index()
-                freq_data = pd.merge(freq_data, filled_data, left_on='timestamp', right_on='index', how='left')
-                freq_data[column] = freq_data[column].ffill().fillna(0)
-                freq_data = freq_data.drop('index', axis=1)
-
-            for column in columns:
-                freq_data[f'{column}_diff'] = freq_data[column].diff().fillna(0)
-            
-            return freq_data
-        
-        def clean_data(df, selected_column):
-            # Remove infinite values
-            df = df[~np.isinf(df[f'{selected_column}_diff'])]
-            
-            # Convert to numeric, coercing errors to NaN
-            df[f'{selected_column}_diff'] = pd.to_numeric(df[f'{selected_column}_diff'], errors='coerce')
-            
-            # Remove NaN values
-            df = df.dropna(subset=[f'{selected_column}_diff'])
-            
-            return df
-
-        def prepare_data_for_regression(df, selected_column):
-            # Ensure Latency is categorical
-            df['Latency'] = pd.Categorical(df['Latency'])
-            
-            # Create dummy variables, dropping the first to avoid perfect multicollinearity
-            latency_dummies = pd.get_dummies(df['Latency'], prefix='Latency', drop_first=True)
-            
-            # Prepare the predictor variables
-            X = sm.add_constant(latency_dummies)
-            
-            # Prepare the response variable (ensure it's non-negative and numeric)
-            y = np.maximum(df[f'{selected_column}_diff'].astype(float), 0)
-            
-            # Convert X to numpy array and ensure it's float
-            X = np.asarray(X).astype(float)
-            
-            # Ensure y is a 1D numpy array
-            y = np.asarray(y).flatten()
-            
-            return X, y
-
-        def run_negative_binomial(X, y):
-            try:
-                model = sm.GLM(y, X, family=sm.families.NegativeBinomial())
-                results = model.fit()
-                return results
-            except Exception as e:
-                st.error(f"Error in Negative Binomial Regression: {str(e)}")
-                return None
+        def render_analysis_results(results, selected_column):
+            def show_error(name):
+                if 'error' in results.get(name, {}):
+                    st.error(results[name]['error'])
+                    return True
+                return False
 
-        def run_glm_poisson(X, y):
-            try:
-                model = sm.GLM(y, X, family=sm.families.Poisson())
-                results = model.fit()
-                return results
-            except Exception as e:
-                st.error(f"Error in GLM Poisson: {str(e)}")
-                return None
+            if 'anova' in results:
+                st.subheader('ANOVA Results')
+                st.write("ANOVA tests if there are significant differences in the means across different groups (latencies).")
+                
+                if not show_error('anova'):
+                    st.write(f"F-statistic: {results['anova']['f_statistic']:.4f}")
+                    st.write(f"p-value: {results['anova']['p_value']:.4f}")
+                    st.write("A small p-value (< 0.05) suggests significant differences between latencies.")
 
-        def improved_chi_square_test(df, selected_column):
-            results = {}
-            for latency in df['Latency'].unique():
-                data = df[df['Latency'] == latency][f'{selected_column}_diff']
+            if 'poisson' in results:
+                st.subheader('Poisson Regression Results')
+                st.write("Poisson regression models count data and can test for the effect of latency on the rate of events.")
                 
-                if len(data) == 0:
-                    st.warning(f"No valid data for latency {latency}")
-                    continue
+                if not show_error('poisson'):
+                    model = results['poisson']
+                    st.code(model['summary'], language=None)
+                    
+                    st.write("\nIncident Rate Ratios:")
+                    st.write(np.exp(model['params']))
+                    st.write("\nConfidence Intervals for IRR:")
+                    st.write(np.exp(model['conf_int']))
+
+            if 'negative_binomial' in results:
+                st.subheader('Negative Binomial Regression Results')
+                st.write("Negative Binomial regression is useful when the data is overdispersed (variance > mean).")
                 
-                # Use fewer bins to avoid empty bins
-                observed, bins = np.histogram(data, bins='auto')
+                if not show_error('negative_binomial'):
+                    st.code(results['negative_binomial']['summary'], language=None)
+                    st.write("Interpretation: Similar to Poisson regression, look at the coefficients and their p-values. "
+                            "The key difference is that Negative Binomial regression allows for more variability in the data. "
+                            "If the results differ significantly from the Poisson regression, it suggests that overdispersion "
+                            "is present and the Negative Binomial model may be more appropriate.")
+
+            if 'glm' in results:
+                st.subheader('Generalized Linear Model (GLM) Results')
+                st.write("GLM with Poisson family, allowing for more complex model specifications.")
                 
-                # Ensure non-zero observed frequencies
-                valid_indices = observed > 0
-                observed = observed[valid_indices]
-                bins = bins[:-1][valid_indices]
+                if not show_error('glm'):
+                    st.code(results['glm']['summary'], language=None)
+                    st.write("Interpretation: The GLM results provide a more flexible framework for analyzing the data. "
+                            "Look at the coefficients, standard errors, and p-values for each latency level. "
+                            "Significant p-values (< 0.05) indicate that the corresponding latency level has a measurable effect "
+                            "on the input frequency compared to the baseline. The magnitude and direction of the coefficients "
+                            "show the strength and direction of these effects.")
+
+            if 'chi_square' in results:
+                st.subheader('Chi-square Goodness-of-fit Test Results')
+                st.write("This test compares the observed frequencies to expected frequencies under a Poisson distribution.")
                 
-                if len(observed) == 0:
-                    st.warning(f"No non-zero observed frequencies for latency {latency}")
-                    continue
+                if not show_error('chi_square'):
+                    for message in results['chi_square']['warnings']:
+                        st.warning(message)
+                    for message in results['chi_square']['errors']:
+                        st.error(message)
+
+                    chi_square_results = results['chi_square']['results']
+                    if chi_square_results:
+                        for latency, result in chi_square_results.items():
+                            st.write(f"Latency {latency}ms - Chi-square statistic: {result['chi2']:.4f}, p-value: {result['p_value']:.4f}")
+                        
+                        st.write("Interpretation: For each latency level, a small p-value (< 0.05) suggests that the observed data "
+                                "doesn't follow a Poisson distribution. This could indicate that the input patterns are more complex "
+                                "than a simple Poisson process, possibly due to the influence of latency or other factors. "
+                                "If p-values are consistently large across latencies, it suggests that a Poisson distribution "
+                                "might be a good fit for modeling the input frequencies.")
+                    else:
+                        st.warning("No valid results from Chi-square test. This may be due to insufficient data or other issues.")
+
+            if 'kruskal' in results:
+                st.subheader('Kruskal-Wallis Test Results')
+                st.write("Non-parametric alternative to one-way ANOVA.")
                 
-                lambda_mle = np.mean(data)
-                expected = stats.poisson.pmf(np.arange(len(observed)), lambda_mle) * sum(observed)
+                if not show_error('kruskal'):
+                    st.write(f"H-statistic: {results['kruskal']['h_statistic']:.4f}")
+                    st.write(f"p-value: {results['kruskal']['p_value']:.4f}")
+
+            if 'anderson' in results:
+                st.subheader('Anderson-Darling Test Results')
+                st.write("This test is often more powerful than the K-S test for detecting differences in distributions.")
                 
-                # Normalize expected frequencies to match the sum of observed frequencies
-                expected = expected * (sum(observed) / sum(expected))
+                if not show_error('anderson'):
+                    st.write(f"Statistic: {results['anderson']['statistic']:.4f}")
+                    st.write(f"Critical Values: {results['anderson']['critical_values']}")
+                    st.write(f"Significance Level: {results['anderson']['significance_level']:.4f}")
+
+            if 'bootstrap' in results:
+                st.subheader('Bootstrap Analysis Results')
+                st.write("Bootstrap analysis to estimate confidence intervals for mean event rates.")
                 
-                try:
-                    chi2, p_value = stats.chisquare(observed, expected)
-                    results[latency] = {'chi2': chi2, 'p_value': p_value}
-                except Exception as e:
-                    st.error(f"Error in Chi-square test for latency {latency}: {str(e)}")
-            
-            return results
+                if not show_error('bootstrap'):
+                    ci_label = f"{confidence_level:.0%} CI"
+                    for latency, result in results['bootstrap']['intervals'].items():
+                        st.write(f"Latency {latency}ms - Mean: {result['mean']:.4f}, "
+                                f"{ci_label}: ({result['ci_lower']:.4f}, {result['ci_upper']:.4f})")
+
+                    differences = results['bootstrap']['differences']
+                    if differences:
+                        st.write(f"Difference in mean event rate compared to {results['bootstrap']['baseline_latency']}ms:")
+                        difference_rows = [{
+                            'Latency': latency,
+                            'Mean Difference': result['difference'],
+                            'Std Error': result['std_error'],
+                            f'{ci_label} Lower': result['ci_lower'],
+                            f'{ci_label} Upper': result['ci_upper'],
+                            'p-value': result['p_value'],
+                        } for latency, result in differences.items()]
+                        st.dataframe(pd.DataFrame(difference_rows).set_index('Latency'))
+                        st.write("An interval that excludes 0 suggests the mean event rate at that latency differs from the baseline.")
+
+        # Poll a background job until it finishes, then rerun the page to show its results
+        @fragment(run_every=1)
+        def show_job_progress(job_id):
+            job = get_job_manager().status(job_id)
+            if job is not None and job['status'] in ('failed', 'cancelled'):
+                st.error(f"Analysis job {job_id} {job['status']}: {job['error']}")
+                return
+            if job is None or job['status'] == 'done':
+                st.rerun()
+            st.info(f"Analyses are running in the background ({job_id}, {job['status']}). "
+                    "You can keep using the page; results will appear here when ready.")
+            st.progress(job['progress'], text=job['message'] or job['status'].capitalize())
+
+        def to_local(epoch):
+            # Naive AEST, which is what the range slider works in
+            return datetime.fromtimestamp(epoch, aest).replace(tzinfo=None)
+
+        # Zooming only reruns the timeline. Plotly zoom events do not reach the
+        # server, so the visible range is set with the slider or by jumping to
+        # an event, and every range is drawn from the rollup level that fits it.
+        @fragment
+        def input_timeline(players, columns):
+            st.subheader('Input Timeline')
+            # Only players have activity files; <world> and the like do not
+            players = [player for player in players if str(player).startswith('Player_')]
+            if not players:
+                st.warning('No players with activity data to show.')
+                return
+            col1, col2 = st.columns(2)
+            player = col1.selectbox('Player', players, key='timeline_player')
+            timeline_columns = col2.multiselect('Inputs', columns, default=columns[:1], key='timeline_columns')
+
+            try:
+                ip_address = player.split('_')[1]
+                # The coarsest level is the cheapest way to find the session span
+                session = get_activity_cache().get_table((ip_address, list(ROLLUPS)[-1]))['timestamp'].to_numpy()
+            except Exception as e:
+                st.error(f"Error loading the activity data for {player}: {str(e)}")
+                return
+            if len(session) == 0:
+                st.warning(f'No activity data available for {player}.')
+                return
+            session_start, session_end = session[0], session[-1] + ROLLUPS[list(ROLLUPS)[-1]]
+
+            # Each player keeps their own range
+            range_key = f'timeline_range_{ip_address}'
+            if range_key not in st.session_state:
+                st.session_state[range_key] = (to_local(session_start), to_local(session_end))
+
+            events = player_events(player_performance, player)
+            event_key = f'timeline_event_{ip_address}'
+
+            def zoom_to_event():
+                index = st.session_state[event_key]
+                if index is None:
+                    st.session_state[range_key] = (to_local(session_start), to_local(session_end))
+                    return
+                event_time = events.loc[index, 'event_time']
+                half = st.session_state['timeline_zoom'] / 2
+                st.session_state[range_key] = (to_local(max(event_time - half, session_start)),
+                                               to_local(min(event_time + half, session_end)))
+
+            def event_label(index):
+                event = events.loc[index]
+                label = f"{event['event_type'].capitalize()} at {to_local(event['event_time']):%H:%M:%S} (round {event['game_round']}"
+                return label + (f", {event['latency']:g} ms)" if pd.notna(event['latency']) else ')')
+
+            col1, col2 = st.columns([3, 1])
+            col1.selectbox('Zoom to event', events.index, index=None, key=event_key, on_change=zoom_to_event,
+                           placeholder='Whole session', format_func=event_label)
+            col2.number_input('Seconds shown', min_value=1, max_value=600, value=30, step=5, key='timeline_zoom')
+            range_start, range_end = st.slider('Visible range', min_value=to_local(session_start),
+                                               max_value=to_local(session_end), step=timedelta(seconds=1),
+                                               format='HH:mm:ss', key=range_key)
+
+            start, end = aest.localize(range_start).timestamp(), aest.localize(range_end).timestamp()
+            if end <= start or not timeline_columns:
+                st.warning('Select at least one input and a visible range longer than a second.')
+                return
+            level, timeline = activity_timeline(ip_address, start, end, timeline_columns)
+
+            times = pd.to_datetime(timeline['timestamp'], unit='s', utc=True).dt.tz_convert(aest).dt.tz_localize(None)
+            fig = go.Figure()
+            for column in timeline_columns:
+                # Only a whole session longer than MAX_POINTS minutes is over budget at the coarsest level
+                x, y = lttb(times.to_numpy(), timeline[column].to_numpy())
+                fig.add_trace(scatter(x, y, mode='lines', line_shape='hv', name=column))
+            shown = events[(events['event_time'] >= start) & (events['event_time'] <= end)]
+            for event_type, color in [('kill', 'green'), ('death', 'red')]:
+                event_times = shown.loc[shown['event_type'] == event_type, 'event_time']
+                fig.add_trace(go.Scatter(x=[to_local(t) for t in event_times], y=np.zeros(len(event_times)),
+                                         mode='markers', name=event_type.capitalize(),
+                                         marker=dict(color=color, symbol='triangle-up', size=10)))
+            fig.update_layout(xaxis_title='Time (AEST)', yaxis_title='Presses per second', height=450)
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"{level} level, {len(timeline)} buckets for {end - start:g} seconds "
+                       f"(at most {MAX_POINTS} points per input)")
 
         # Streamlit app
         st.title('Comprehensive Player Performance Analysis')
@@ -197,17 +378,51 @@ def show_analysis():
         show_kruskal = st.sidebar.checkbox('Kruskal-Wallis Test')
         show_anderson = st.sidebar.checkbox('Anderson-Darling Test')
         show_bootstrap = st.sidebar.checkbox('Bootstrap Analysis')
+        show_event_windows = st.sidebar.checkbox('Kill/Death Activity Windows')
+        show_timeline = st.sidebar.checkbox('Input Timeline')
+
+        if show_event_windows:
+            st.sidebar.subheader('Activity Window Settings')
+            seconds_before = st.sidebar.number_input('Seconds Before Event', min_value=0.5, max_value=60.0, value=5.0, step=0.5)
+            seconds_after = st.sidebar.number_input('Seconds After Event', min_value=0.5, max_value=60.0, value=5.0, step=0.5)
+
+        if show_bootstrap:
+            st.sidebar.subheader('Bootstrap Settings')
+            n_iterations = st.sidebar.number_input('Resamples', min_value=100, max_value=100000, value=10000, step=1000)
+            bootstrap_method = st.sidebar.selectbox('Interval Method', ['Percentile', 'BCa'])
+            confidence_level = st.sidebar.slider('Confidence Level', min_value=0.80, max_value=0.99, value=0.95, step=0.01)
+            bootstrap_seed = st.sidebar.number_input('Random Seed', min_value=0, value=42, step=1)
+            baseline_latency = st.sidebar.selectbox('Baseline Latency', sorted(selected_latencies)) if selected_latencies else None
+
+        st.sidebar.subheader('Execution')
+        run_in_background = st.sidebar.checkbox('Run analyses in background', value=True,
+                                                help='Heavy tests run on a worker process pool so the page stays responsive.')
+
+        selected_analyses = {name for name, show in [
+            ('anova', show_anova), ('poisson', show_poisson), ('negative_binomial', show_negative_binomial),
+            ('glm', show_glm), ('chi_square', show_chi_square), ('kruskal', show_kruskal),
+            ('anderson', show_anderson), ('bootstrap', show_bootstrap),
+        ] if show}
+        analysis_settings = {}
+        if show_bootstrap:
+            analysis_settings = {
+                'n_iterations': int(n_iterations),
+                'bootstrap_method': bootstrap_method.lower(),
+                'confidence_level': confidence_level,
+                'bootstrap_seed': int(bootstrap_seed),
+                'baseline_latency': baseline_latency,
+            }
 
         if selected_players and selected_latencies:
             all_freq_data = []
 
-            for player in selected_players:
-                mouse_keyboard_data = load_mouse_data(player.split('_')[1])
-                if mouse_keyboard_data is None:
-                    st.warning(f"No mouse movement data available for {player}")
-                    continue
-
-                mouse_keyboard_data['timestamp'] = pd.to_datetime(mouse_keyboard_data['timestamp'], unit='s').apply(to_aest)
+            # Load one player's activity file and build the frequency data for
+            # every selected latency window. Safe to run on a worker thread.
+            def load_player_frequency_data(player):
+                # create_frequency_data keeps the last sample of every second,
+                # which is exactly what the per-second rollup holds
+                mouse_keyboard_data = load_mouse_data((player.split('_')[1], '1s'))
+                player_freq_data = []
 
                 for latency in selected_latencies:
                     latency_data = player_performance[(player_performance['killer_ip'] == player) & 
@@ -215,13 +430,36 @@ def show_analysis():
                     if not latency_data.empty:
                         start = latency_data['timestamp'].min()
                         end = start + timedelta(minutes=10)
-                        period_data = mouse_keyboard_data[(mouse_keyboard_data['timestamp'] >= start) & 
-                                                        (mouse_keyboard_data['timestamp'] <= end)]
+                        period_data = activity_window(mouse_keyboard_data, start, end, aest)
                         
                         freq_data = create_frequency_data(period_data, input_columns, start)
                         freq_data['Player'] = player
                         freq_data['Latency'] = latency
-                        all_freq_data.append(freq_data)
+                        player_freq_data.append(freq_data)
+
+                return player_freq_data
+
+            # Load players concurrently; file parsing and the per-window work
+            # release the GIL for most of their time
+            player_results = {}
+            progress = st.progress(0.0, text=f"Loading activity data for {len(selected_players)} player(s)...")
+            with ThreadPoolExecutor(max_workers=min(len(selected_players), os.cpu_count() or 1)) as executor:
+                # Each load runs in a copy of this rerun's context, so its timings and cache lookups are counted
+                futures = {executor.submit(contextvars.copy_context().run, load_player_frequency_data, player): player
+                           for player in selected_players}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    player = futures[future]
+                    try:
+                        player_results[player] = future.result()
+                    except Exception as e:
+                        st.error(f"Error loading the mouse movement data for IP {player.split('_')[1]}: {str(e)}")
+                        st.warning(f"No mouse movement data available for {player}")
+                    progress.progress(done / len(futures), text=f"Loaded {player} ({done}/{len(futures)})")
+            progress.empty()
+
+            # Assemble in selection order so the combined data is deterministic
+            for player in selected_players:
+                all_freq_data.extend(player_results.get(player, []))
 
             if all_freq_data:
                 df = pd.concat(all_freq_data, ignore_index=True)
@@ -246,10 +484,10 @@ def show_analysis():
                     fig_cdf = go.Figure()
                     for (player, latency), group in df.groupby(['Player', 'Latency']):
                         data = group[f'{selected_column}_diff']
-                        sorted_data = np.sort(data)
-                        cdf = np.arange(1, len(sorted_data) + 1) / len(sorted_data)
-                        fig_cdf.add_trace(go.Scatter(x=sorted_data, y=cdf, mode='lines',
-                                                    name=f'{player} - {latency}ms'))
+                        # Send a bounded number of points per curve rather than every second of data
+                        sorted_data, cdf = cdf_points(data)
+                        fig_cdf.add_trace(scatter(sorted_data, cdf, mode='lines',
+                                                  name=f'{player} - {latency}ms'))
                     
                     fig_cdf.update_layout(title=f'CDF of {selected_column} (Events per Second)',
                                         xaxis_title='Events per Second',
@@ -267,8 +505,9 @@ def show_analysis():
                     for (player, latency), group in df.groupby(['Player', 'Latency']):
                         data = group[f'{selected_column}_diff']
                         qq = stats.probplot(data, dist='norm')
-                        fig_qq.add_trace(go.Scatter(x=qq[0][0], y=qq[0][1], mode='markers',
-                                                    name=f'{player} - {latency}ms'))
+                        theoretical, ordered = qq_points(qq[0][0], qq[0][1])
+                        fig_qq.add_trace(scatter(theoretical, ordered, mode='markers',
+                                                 name=f'{player} - {latency}ms'))
                     
                     fig_qq.update_layout(title=f'Q-Q Plot of {selected_column} (Events per Second)',
                                         xaxis_title='Theoretical Quantiles',
@@ -277,110 +516,75 @@ def show_analysis():
                     del fig_qq
                     gc.collect()
 
-                if show_anova:
-                    st.subheader('ANOVA Results')
-                    st.write("ANOVA tests if there are significant differences in the means across different groups (latencies).")
-                    
-                    anova_groups = [group[f'{selected_column}_diff'].values for name, group in df.groupby('Latency')]
-                    f_statistic, p_value = stats.f_oneway(*anova_groups)
-                    
-                    st.write(f"F-statistic: {f_statistic:.4f}")
-                    st.write(f"p-value: {p_value:.4f}")
-                    st.write("A small p-value (< 0.05) suggests significant differences between latencies.")
-
-                if show_poisson:
-                    st.subheader('Poisson Regression Results')
-                    st.write("Poisson regression models count data and can test for the effect of latency on the rate of events.")
-                    
-                    model = poisson(f"{selected_column}_diff ~ C(Latency)", data=df).fit()
-                    st.write(model.summary())
-                    
-                    st.write("\nIncident Rate Ratios:")
-                    st.write(np.exp(model.params))
-                    st.write("\nConfidence Intervals for IRR:")
-                    st.write(np.exp(model.conf_int()))
-
-                if show_negative_binomial:
-                    st.subheader('Negative Binomial Regression Results')
-                    st.write("Negative Binomial regression is useful when the data is overdispersed (variance > mean).")
-                    
-                    X, y = prepare_data_for_regression(df, selected_column)
-                    nb_results = run_negative_binomial(X, y)
-                    if nb_results:
-                        st.write(nb_results.summary())
-                        st.write("Interpretation: Similar to Poisson regression, look at the coefficients and their p-values. "
-                                "The key difference is that Negative Binomial regression allows for more variability in the data. "
-                                "If the results differ significantly from the Poisson regression, it suggests that overdispersion "
-                                "is present and the Negative Binomial model may be more appropriate.")
-
-                if show_glm:
-                    st.subheader('Generalized Linear Model (GLM) Results')
-                    st.write("GLM with Poisson family, allowing for more complex model specifications.")
-                    
-                    X, y = prepare_data_for_regression(df, selected_column)
-                    glm_results = run_glm_poisson(X, y)
-                    if glm_results:
-                        st.write(glm_results.summary())
-                        st.write("Interpretation: The GLM results provide a more flexible framework for analyzing the data. "
-                                "Look at the coefficients, standard errors, and p-values for each latency level. "
-                                "Significant p-values (< 0.05) indicate that the corresponding latency level has a measurable effect "
-                                "on the input frequency compared to the baseline. The magnitude and direction of the coefficients "
-                                "show the strength and direction of these effects.")
-
-                if show_chi_square:
-                    st.subheader('Chi-square Goodness-of-fit Test Results')
-                    st.write("This test compares the observed frequencies to expected frequencies under a Poisson distribution.")
-                    
-                    chi_square_results = improved_chi_square_test(df, selected_column)
-                    if chi_square_results:
-                        for latency, result in chi_square_results.items():
-                            st.write(f"Latency {latency}ms - Chi-square statistic: {result['chi2']:.4f}, p-value: {result['p_value']:.4f}")
-                        
-                        st.write("Interpretation: For each latency level, a small p-value (< 0.05) suggests that the observed data "
-                                "doesn't follow a Poisson distribution. This could indicate that the input patterns are more complex "
-                                "than a simple Poisson process, possibly due to the influence of latency or other factors. "
-                                "If p-values are consistently large across latencies, it suggests that a Poisson distribution "
-                                "might be a good fit for modeling the input frequencies.")
+                if selected_analyses:
+                    analysis_data = df[[f'{selected_column}_diff', 'Latency']]
+                    if run_in_background:
+                        # Identical requests from any session share one job
+                        job_key = fingerprint(analysis_data, selected_column,
+                                              repr((sorted(selected_analyses), sorted(analysis_settings.items()))))
+                        job_id = get_job_manager().submit(run_analyses, analysis_data, selected_column,
+                                                          selected_analyses, analysis_settings,
+                                                          name='Statistical analyses', key=job_key)
+                        results = get_job_manager().result(job_id)
+                        if results is None:
+                            show_job_progress(job_id)
                     else:
-                        st.warning("No valid results from Chi-square test. This may be due to insufficient data or other issues.")
+                        results = run_analyses(analysis_data, selected_column, selected_analyses, analysis_settings)
 
-                if show_kruskal:
-                    st.subheader('Kruskal-Wallis Test Results')
-                    st.write("Non-parametric alternative to one-way ANOVA.")
-                    
-                    groups = [group[f'{selected_column}_diff'].values for name, group in df.groupby('Latency')]
-                    h_statistic, p_value = stats.kruskal(*groups)
-                    st.write(f"H-statistic: {h_statistic:.4f}")
-                    st.write(f"p-value: {p_value:.4f}")
-
-                if show_anderson:
-                    st.subheader('Anderson-Darling Test Results')
-                    st.write("This test is often more powerful than the K-S test for detecting differences in distributions.")
-                    
-                    groups = [group[f'{selected_column}_diff'].values for name, group in df.groupby('Latency')]
-                    statistic, critical_values, significance_level = anderson_ksamp(groups)
-                    st.write(f"Statistic: {statistic:.4f}")
-                    st.write(f"Critical Values: {critical_values}")
-                    st.write(f"Significance Level: {significance_level:.4f}")
-
-                if show_bootstrap:
-                    st.subheader('Bootstrap Analysis Results')
-                    st.write("Bootstrap analysis to estimate confidence intervals for mean event rates.")
-                    
-                    n_iterations = 1000
-                    for latency in selected_latencies:
-                        data = df[df['Latency'] == latency][f'{selected_column}_diff']
-                        bootstrap_means = [np.mean(np.random.choice(data, size=len(data), replace=True)) 
-                                        for _ in range(n_iterations)]
-                        ci_lower, ci_upper = np.percentile(bootstrap_means, [2.5, 97.5])
-                        st.write(f"Latency {latency}ms - Mean: {np.mean(data):.4f}, "
-                                f"95% CI: ({ci_lower:.4f}, {ci_upper:.4f})")
+                    if results is not None:
+                        render_analysis_results(results, selected_column)
 
             else:
                 st.warning('No data available for the selected players and latencies.')
 
+            if show_event_windows:
+                st.subheader('Input Activity Around Kills and Deaths')
+                st.write(f"Input events in the {seconds_before:g} seconds before and {seconds_after:g} seconds after "
+                        "every kill and death of the selected players, taken from the cumulative activity counters.")
+
+                event_tables = []
+                for player in selected_players:
+                    if player not in player_results:
+                        continue
+                    events = player_events(player_performance, player)
+                    events = events[events['latency'].isin(selected_latencies)]
+                    activity = load_mouse_data(player.split('_')[1])
+                    event_tables.append(event_activity_features(events, activity, input_columns,
+                                                                seconds_before, seconds_after))
+
+                if event_tables:
+                    event_features = pd.concat(event_tables, ignore_index=True)
+                    event_features = event_features[event_features['window_covered']]
+                    feature_columns = [f'{selected_column}_before', f'{selected_column}_after', 'seconds_since_input']
+
+                    st.write(f"Mean {selected_column} activity by event type and latency:")
+                    st.dataframe(event_features.groupby(['player', 'event_type', 'latency'])[feature_columns]
+                                 .agg(['mean', 'count']))
+                    st.write("Per-event features:")
+                    st.dataframe(event_features.drop(columns=['event_time', 'window_covered']), hide_index=True)
+                else:
+                    st.warning('No activity data available for the selected players.')
+
+            cache_stats = get_activity_cache().stats()
+            st.sidebar.caption(
+                f"Activity cache: {cache_stats['entries']} files, "
+                f"{cache_stats['bytes'] / 1024 ** 2:.0f}/{cache_stats['max_bytes'] / 1024 ** 2:.0f} MB, "
+                f"{cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                f"{cache_stats['evictions']} evictions"
+            )
+            store_status = get_activity_watcher().status()
+            st.sidebar.caption(
+                f"Activity store: {store_status['converted']} files converted, "
+                f"{store_status['converting']} converting, {len(store_status['failed'])} failed "
+                f"({store_status['watching']})"
+            )
+
         else:
             st.warning('Please select at least one player and one latency value.')
 
+        # Needs only a player, so it is also available before any latency is selected
+        if show_timeline:
+            input_timeline(selected_players or list(all_players), input_columns)
+
     else:
         st.error("Cannot proceed with analysis due to data loading error.")
\ No newline at end of file
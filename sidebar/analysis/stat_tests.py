@@ -0,0 +1,173 @@
+# Statistical tests behind the Analysis page. Everything here is free of
+# Streamlit calls so it can run on the background job pool; the page renders
+# the returned results.
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from scipy.stats import anderson_ksamp
+import statsmodels.api as sm
+from statsmodels.formula.api import poisson
+from utils.bootstrap import bootstrap_mean_ci, bootstrap_mean_difference
+from utils.model_cache import cached_fit
+
+
+def prepare_data_for_regression(df, selected_column):
+    # Ensure Latency is categorical
+    latency = pd.Categorical(df['Latency'])
+    
+    # Create dummy variables, dropping the first to avoid perfect multicollinearity
+    latency_dummies = pd.get_dummies(latency, prefix='Latency', drop_first=True)
+    
+    # Prepare the predictor variables
+    X = sm.add_constant(latency_dummies)
+    
+    # Prepare the response variable (ensure it's non-negative and numeric)
+    y = np.maximum(df[f'{selected_column}_diff'].astype(float), 0)
+    
+    # Convert X to numpy array and ensure it's float
+    X = np.asarray(X).astype(float)
+    
+    # Ensure y is a 1D numpy array
+    y = np.asarray(y).flatten()
+    
+    return X, y
+
+
+def latency_groups(df, selected_column):
+    return {latency: group[f'{selected_column}_diff'].values
+            for latency, group in df.groupby('Latency', observed=True)}
+
+
+def run_poisson(df, selected_column, settings):
+    # Fits are cached on a fingerprint of the design data, so toggling
+    # other options on the page does not trigger a refit
+    formula = f"{selected_column}_diff ~ C(Latency)"
+    poisson_data = df[[f'{selected_column}_diff', 'Latency']]
+    return cached_fit(poisson_data, formula, 'poisson',
+                      lambda: poisson(formula, data=poisson_data).fit(disp=0))
+
+
+def run_negative_binomial(df, selected_column, settings):
+    X, y = prepare_data_for_regression(df, selected_column)
+    return cached_fit((X, y), 'const + Latency dummies', 'negative_binomial',
+                      lambda: sm.GLM(y, X, family=sm.families.NegativeBinomial()).fit())
+
+
+def run_glm_poisson(df, selected_column, settings):
+    X, y = prepare_data_for_regression(df, selected_column)
+    return cached_fit((X, y), 'const + Latency dummies', 'glm_poisson',
+                      lambda: sm.GLM(y, X, family=sm.families.Poisson()).fit())
+
+
+def improved_chi_square_test(df, selected_column, settings):
+    results = {}
+    warnings = []
+    errors = []
+    for latency in df['Latency'].unique():
+        data = df[df['Latency'] == latency][f'{selected_column}_diff']
+        
+        if len(data) == 0:
+            warnings.append(f"No valid data for latency {latency}")
+            continue
+        
+        # Use fewer bins to avoid empty bins
+        observed, bins = np.histogram(data, bins='auto')
+        
+        # Ensure non-zero observed frequencies
+        valid_indices = observed > 0
+        observed = observed[valid_indices]
+        bins = bins[:-1][valid_indices]
+        
+        if len(observed) == 0:
+            warnings.append(f"No non-zero observed frequencies for latency {latency}")
+            continue
+        
+        lambda_mle = np.mean(data)
+        expected = stats.poisson.pmf(np.arange(len(observed)), lambda_mle) * sum(observed)
+        
+        # Normalize expected frequencies to match the sum of observed frequencies
+        expected = expected * (sum(observed) / sum(expected))
+        
+        try:
+            chi2, p_value = stats.chisquare(observed, expected)
+            results[latency] = {'chi2': chi2, 'p_value': p_value}
+        except Exception as e:
+            errors.append(f"Error in Chi-square test for latency {latency}: {str(e)}")
+    
+    return {'results': results, 'warnings': warnings, 'errors': errors}
+
+
+def run_anova(df, selected_column, settings):
+    f_statistic, p_value = stats.f_oneway(*latency_groups(df, selected_column).values())
+    return {'f_statistic': f_statistic, 'p_value': p_value}
+
+
+def run_kruskal(df, selected_column, settings):
+    h_statistic, p_value = stats.kruskal(*latency_groups(df, selected_column).values())
+    return {'h_statistic': h_statistic, 'p_value': p_value}
+
+
+def run_anderson(df, selected_column, settings):
+    statistic, critical_values, significance_level = anderson_ksamp(list(latency_groups(df, selected_column).values()))
+    return {'statistic': statistic, 'critical_values': critical_values, 'significance_level': significance_level}
+
+
+def run_bootstrap(df, selected_column, settings):
+    groups = latency_groups(df, selected_column)
+    method = settings['bootstrap_method']
+    n_iterations = settings['n_iterations']
+    confidence_level = settings['confidence_level']
+    seed = settings['bootstrap_seed']
+
+    intervals = {latency: bootstrap_mean_ci(data, n_iterations, confidence_level, method, seed=seed)
+                 for latency, data in groups.items()}
+
+    baseline_latency = settings.get('baseline_latency')
+    differences = {}
+    if baseline_latency in groups:
+        for latency, data in groups.items():
+            if latency != baseline_latency:
+                differences[latency] = bootstrap_mean_difference(data, groups[baseline_latency], n_iterations,
+                                                                 confidence_level, method, seed=seed)
+
+    return {'intervals': intervals, 'baseline_latency': baseline_latency, 'differences': differences}
+
+
+# Analyses in the order the page displays them
+ANALYSES = {
+    'anova': run_anova,
+    'poisson': run_poisson,
+    'negative_binomial': run_negative_binomial,
+    'glm': run_glm_poisson,
+    'chi_square': improved_chi_square_test,
+    'kruskal': run_kruskal,
+    'anderson': run_anderson,
+    'bootstrap': run_bootstrap,
+}
+
+ANALYSIS_ERRORS = {
+    'negative_binomial': 'Error in Negative Binomial Regression',
+    'glm': 'Error in GLM Poisson',
+}
+
+
+def run_analyses(df, selected_column, selected, settings, progress=None):
+    """
+    Run the selected analyses in display order and return {name: result}.
+
+    A failing analysis is reported as {'error': message} instead of aborting
+    the others. progress, if given, is called as progress(fraction, message).
+    """
+    names = [name for name in ANALYSES if name in selected]
+    results = {}
+    for i, name in enumerate(names):
+        if progress is not None:
+            progress(i / len(names), f"Running {name.replace('_', ' ')}")
+        try:
+            results[name] = ANALYSES[name](df, selected_column, settings)
+        except Exception as e:
+            results[name] = {'error': f"{ANALYSIS_ERRORS.get(name, 'Error in ' + name)}: {str(e)}"}
+    if progress is not None:
+        progress(1.0, 'Finished')
+    return results
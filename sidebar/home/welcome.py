@@ -3,8 +3,11 @@ from PIL import Image
 import time
 import os
 import subprocess
+import tempfile
 
-st.set_page_config(layout="wide", page_title="Quake 3 Analysis Dashboard", page_icon="🎮")
+from config import IMPORT_FOLDER
+from utils.pipeline import get_ingest_service
+from utils.ui import fragment
 
 def show_welcome():
     st.markdown("""
@@ -51,31 +54,59 @@ def show_welcome():
     3. **Visualisation**: The processed data is transformed into interactive graphs and charts.
     """)
 
-    # uploaded_files = st.file_uploader("Upload file/s", accept_multiple_files=True)
-
-    # if st.button("Upload"):
-    #     if uploaded_files:
-    #         for uploaded_file in uploaded_files:
-    #             bytes_data = uploaded_file.read()
-    #             st.write(f"Filename: {uploaded_file.name}")
-                
-    #             # Save the file to the 'app/import' directory
-    #             save_path = os.path.join('app', 'import', uploaded_file.name)
-    #             with open(save_path, 'wb') as f:
-    #                 f.write(bytes_data)
-    #             st.success(f"File {uploaded_file.name} has been uploaded successfully!")
-    #     else:
-    #         st.warning("Please select files to upload.")
-
-    # if st.button("Reset"):
-    #     try:
-    #         # Run the reset script
-    #         result = subprocess.run(['python', 'processes/reset.py'], capture_output=True, text=True, check=True)
-    #         st.success("Reset completed successfully!")
-    #         if result.stdout:
-    #             st.info(f"Reset script output: {result.stdout}")
-    #     except subprocess.CalledProcessError as e:
-    #         st.error(f"An error occurred during reset: {e.stderr}")
-    
-    
-    # # Buttons don't work anyway when deployed to streamlit cloud (FYI- won't load if data is not pre-loaded)
+    show_ingest()
+
+
+def save_upload(uploaded_file):
+    """Write an uploaded log into the import folder; returns its path."""
+    os.makedirs(IMPORT_FOLDER, exist_ok=True)
+    path = os.path.join(IMPORT_FOLDER, os.path.basename(uploaded_file.name))
+    # Written under another name and renamed, so the folder watcher never sees half a file
+    with tempfile.NamedTemporaryFile(dir=IMPORT_FOLDER, suffix='.part', delete=False) as file:
+        file.write(uploaded_file.getbuffer())
+    os.replace(file.name, path)
+    return path
+
+
+def show_pipeline_run(job):
+    if job['status'] == 'failed':
+        st.error(f"{job['file']}: {job['error']}")
+    elif job['status'] == 'done':
+        st.success(f"{job['file']}: processed, the dashboards now show its data.")
+    elif job['status'] == 'cancelled':
+        st.warning(f"{job['file']}: cancelled.")
+    else:
+        st.progress(job['progress'], text=f"{job['file']}: {job['message'] or job['status'].capitalize()}")
+
+
+# Poll the pipeline runs while any is active, then rerun the page once they are done
+@fragment(run_every=1)
+def show_active_runs():
+    jobs = get_ingest_service().jobs()
+    if not any(job['status'] in ('queued', 'running') for job in jobs):
+        st.rerun()
+    for job in jobs:
+        show_pipeline_run(job)
+
+
+def show_ingest():
+    st.subheader("Process a Game Log")
+    st.write(f"Upload a Quake 3 server log, or copy it into `{IMPORT_FOLDER}`. It is processed in the "
+             "background and the dashboards switch to the new data when every stage has finished.")
+
+    uploaded_file = st.file_uploader("Game log", type=['log'])
+    if st.button("Process log"):
+        if uploaded_file is None:
+            st.warning("Please select a log file to upload.")
+        else:
+            try:
+                get_ingest_service().submit(save_upload(uploaded_file))
+            except OSError as e:
+                st.error(f"Could not save {uploaded_file.name}: {e}")
+
+    jobs = get_ingest_service().jobs()
+    if any(job['status'] in ('queued', 'running') for job in jobs):
+        show_active_runs()
+    else:
+        for job in jobs:
+            show_pipeline_run(job)
@@ -4,28 +4,18 @@ from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit_toggle as tog
+from utils.datasets import get_dataset
+from utils.ui import fragment
+from utils.player_stats import build_player_round_stats, build_player_stats
 
-input_path = f"{PROCESSED_DATA_FOLDER}/player_performance.csv" ##path
-sb_summary = f"{PROCESSED_DATA_FOLDER}/round_summary_adjusted.csv" ##path
-
-# Load data
-@st.cache_data
+# Load data (called from show_all_players; nothing is read at import time)
 def load_data():
-    df = pd.read_csv(input_path)
-    sb = pd.read_csv(sb_summary)
-    return df, sb
-
-df, sb = load_data()
-
-# Data preparation
-select_maps = df['map'].unique()
-select_latency = df['latency'].unique()
-select_latency.sort()
-select_player = df['player_ip'].unique()
-select_round = df['game_round'].unique()
-
-# Page title
-st.title("Player Performance")
+    try:
+        return get_dataset('player_round_stats'), get_dataset('player_stats')
+    except FileNotFoundError:
+        # Outputs from before the player stats stage; derive the statistics on the fly
+        round_stats = build_player_round_stats(get_dataset('player_performance'), get_dataset('round_summary'))
+        return round_stats, build_player_stats(round_stats)
 
 def create_dual_line_chart(player_data):
     fig = make_subplots(rows=1, cols=1, specs=[[{"secondary_y": True}]])
@@ -37,11 +27,8 @@ def create_dual_line_chart(player_data):
     )
     
     # Add deaths line
-    deaths_data = df[(df['victim_ip'] == player_data['player_ip'].iloc[0]) & (df['game_round'].isin(player_data['game_round']))]
-    deaths_per_round = deaths_data.groupby('game_round')['deaths_total'].sum().reindex(player_data['game_round']).fillna(0)
-    
     fig.add_trace(
-        go.Scatter(x=player_data['game_round'], y=deaths_per_round, mode='lines', name='Deaths', line=dict(color='red')),
+        go.Scatter(x=player_data['game_round'], y=player_data['deaths'], mode='lines', name='Deaths', line=dict(color='red')),
         secondary_y=True,
     )
     
@@ -58,11 +45,59 @@ def create_dual_line_chart(player_data):
     
     return fig
 
-# Get all players
-all_players = sb['player_ip'].unique()
+def create_performance_chart(round_stats_by_player, selected_players, display_option):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
 
-# Create a container for the scrollable area
-player_container = st.container()
+    for player in selected_players:
+        player_data = round_stats_by_player.loc[[player]]
+        
+        if display_option in ["Score"]:
+            fig.add_trace(
+                go.Scatter(x=player_data['game_round'], y=player_data['score'], mode='lines', name=f'{player}'),
+                secondary_y=False,
+            )
+        
+        if display_option in ["Deaths"]:
+            fig.add_trace(
+                go.Scatter(x=player_data['game_round'], y=player_data['deaths'], mode='lines', name=f'{player}'),
+                secondary_y=True,
+            )
+
+    fig.update_layout(
+        height=600,
+        title_text="Player Performance Over Rounds",
+        legend_title_text="Player Data"
+    )
+
+    fig.update_xaxes(title_text="Rounds")
+    fig.update_yaxes(title_text="Score", secondary_y=False)
+    fig.update_yaxes(title_text="Deaths", secondary_y=True)
+
+    return fig
+
+# The filters and the big graph rerun on their own; the statistics table
+# below does not depend on them
+@fragment
+def performance_chart(round_stats_by_player, all_players):
+    with st.expander("Filters", expanded=True):
+        # Radio options for line display
+        display_option = st.radio(
+            "Select data to display:",
+            ("Score", "Deaths"), horizontal=True
+        )
+
+        # Create checkboxes for player selection
+        st.caption("Select Players")
+        cols = st.columns(6)
+        selected_players = []
+        for i, player in enumerate(all_players):
+            # Default to first 5 players checked
+            if cols[i % 6].checkbox(player, value=(i < 5), key=f"player_{player}"):
+                selected_players.append(player)
+
+    # Display the big graph
+    st.plotly_chart(create_performance_chart(round_stats_by_player, selected_players, display_option),
+                    use_container_width=True)
 
 def show_all_players():
     
@@ -72,10 +107,10 @@ def show_all_players():
     # col4, col5, col6 = st.columns(3)
 
     # for i, player in enumerate(all_players):
-    #     player_data = sb[sb['player_ip'] == player]
-    #     total_score = player_data['score'].sum()
-    #     avg_score = player_data['score'].mean()
-    #     total_deaths = df[(df['victim_ip'] == player) & (df['game_round'].isin(player_data['game_round']))]['deaths_total'].sum()
+    #     player_data = round_stats_by_player.loc[[player]].reset_index()
+    #     total_score = player_stats.loc[player, 'total_score']
+    #     avg_score = player_stats.loc[player, 'avg_score']
+    #     total_deaths = player_stats.loc[player, 'total_deaths']
 
     #     # Determine which column to place the player info in
     #     col = [col1, col2, col3, col4, col5, col6][i % 6]
@@ -87,91 +122,26 @@ def show_all_players():
     #         st.write(f"Total Deaths: {total_deaths:.0f}")
     #         st.plotly_chart(create_dual_line_chart(player_data), use_container_width=True)
 
-    # Load data
-    @st.cache_data
-    def load_data():
-        df = pd.read_csv(f"{PROCESSED_DATA_FOLDER}/player_performance.csv")
-        sb = pd.read_csv(f"{PROCESSED_DATA_FOLDER}/round_summary_adjusted.csv")
-        return df, sb
-
-    df, sb = load_data()
+    # Load the precomputed statistics, indexed by player for direct lookups
+    round_stats, player_stats = load_data()
+    round_stats_by_player = round_stats.set_index('player_ip')
+    player_stats = player_stats.set_index('player_ip')
 
     # Page title
     st.title("Player Performance")
 
-    # Sidebar
-    st.sidebar.subheader("Select View")
-
-    # Radio options for line display
-    display_option = st.sidebar.radio(
-        "Select data to display:",
-        ("Score", "Deaths"), label_visibility="collapsed"
-    )
-
     # Get all players
-    all_players = sb['player_ip'].unique()
+    all_players = player_stats.index.to_numpy()
 
-    st.sidebar.subheader("Select Players")
-    # Create checkboxes for player selection
-    selected_players = []
-    for player in all_players:
-        if st.sidebar.checkbox(player, value=(player in all_players[:5])):  # Default to first 5 players checked
-            selected_players.append(player)
-
-    # Create the big graph
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    for player in selected_players:
-        player_data = sb[sb['player_ip'] == player]
-        
-        if display_option in ["Score"]:
-            fig.add_trace(
-                go.Scatter(x=player_data['game_round'], y=player_data['score'], mode='lines', name=f'{player}'),
-                secondary_y=False,
-            )
-        
-        if display_option in ["Deaths"]:
-            deaths_data = df[(df['victim_ip'] == player) & (df['game_round'].isin(player_data['game_round']))]
-            deaths_per_round = deaths_data.groupby('game_round')['deaths_total'].sum().reindex(player_data['game_round']).fillna(0)
-            
-            fig.add_trace(
-                go.Scatter(x=player_data['game_round'], y=deaths_per_round, mode='lines', name=f'{player}'),
-                secondary_y=True,
-            )
-
-    fig.update_layout(
-        height=600,
-        title_text="Player Performance Over Rounds",
-        legend_title_text="Player Data"
-    )
-
-    fig.update_xaxes(title_text="Rounds")
-    fig.update_yaxes(title_text="Score", secondary_y=False)
-    fig.update_yaxes(title_text="Deaths", secondary_y=True)
-
-    # Display the big graph
-    st.plotly_chart(fig, use_container_width=True)
+    performance_chart(round_stats_by_player, all_players)
 
     # Create and display the table
     st.header("Key Player Statistics")
 
-    table_data = []
-    for player in all_players:
-        player_data = sb[sb['player_ip'] == player]
-        total_score = player_data['score'].sum()
-        avg_score = player_data['score'].mean()
-        
-        deaths_data = df[(df['victim_ip'] == player) & (df['game_round'].isin(player_data['game_round']))]
-        total_deaths = deaths_data['deaths_total'].sum()
-        avg_deaths = total_deaths / len(player_data) if len(player_data) > 0 else 0
-        
-        table_data.append({
-            "Player": player,
-            "Total Score": f"{total_score:.0f}",
-            "Avg Score": f"{avg_score:.2f}",
-            "Total Deaths": f"{total_deaths:.0f}",
-            "Avg Deaths": f"{avg_deaths:.2f}"
-        })
-
-    table_df = pd.DataFrame(table_data)
-    st.dataframe(table_df.set_index('Player'), hide_index=False)    
\ No newline at end of file
+    table_df = pd.DataFrame({
+        "Total Score": player_stats['total_score'].map("{:.0f}".format),
+        "Avg Score": player_stats['avg_score'].map("{:.2f}".format),
+        "Total Deaths": player_stats['total_deaths'].map("{:.0f}".format),
+        "Avg Deaths": player_stats['avg_deaths'].map("{:.2f}".format),
+    }).rename_axis('Player')
+    st.dataframe(table_df, hide_index=False)    
\ No newline at end of file
@@ -1,71 +1,92 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+from scipy import stats
 from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER
 import plotly.graph_objects as go
+from utils.datasets import get_dataset, get_derived
+from utils.ui import fragment
+
+def generate_statistics(df, baseline_latency=None, confidence=0.95):
+    # Player x round score matrix for every latency in one pivot; each round
+    # belongs to a single latency, so other latencies' rounds are NaN
+    scores = df.pivot_table(index=['latency', 'player_ip'], columns='game_round', values='score', aggfunc='mean',
+                            observed=True)
+    scores.columns = [f'Round_{game_round}' for game_round in scores.columns]
+
+    n_rounds = scores.notna().sum(axis=1)
+    statistics = pd.DataFrame({
+        'Rounds': n_rounds,
+        'Mean': scores.mean(axis=1),
+        'StdDev': scores.std(axis=1),
+    })
+
+    # t-based confidence interval for each player's mean score at each latency
+    std_error = statistics['StdDev'] / np.sqrt(n_rounds)
+    t_critical = stats.t.ppf((1 + confidence) / 2, np.maximum(n_rounds - 1, 1))
+    statistics['CI_Lower'] = statistics['Mean'] - t_critical * std_error
+    statistics['CI_Upper'] = statistics['Mean'] + t_critical * std_error
+
+    # Difference from the same player's mean at the baseline latency
+    if baseline_latency is not None and baseline_latency in statistics.index.get_level_values('latency'):
+        baseline_means = statistics.xs(baseline_latency, level='latency')['Mean']
+        statistics['mean_difference'] = statistics['Mean'] - baseline_means.reindex(
+            statistics.index.get_level_values('player_ip')).to_numpy()
+    else:
+        statistics['mean_difference'] = 0
+
+    return scores, statistics
+
+def select_statistics(df, baseline_latency, latencies, players):
+    """
+    Chart and table data for one filter selection: the player x latency matrix
+    of mean scores and the statistics rows of the shown latencies and players.
+    """
+    scores, statistics = get_derived('latency_statistics', ['round_summary'], generate_statistics, baseline_latency)
+    means = statistics['Mean'].unstack('latency')
+    means = means.loc[means.index.isin(players), [latency for latency in means.columns if latency in latencies]]
+    shown = statistics[statistics.index.get_level_values('latency').isin(latencies) &
+                       statistics.index.get_level_values('player_ip').isin(players)]
+    return means, shown
+
+def checkbox_columns(options, key_prefix, format_option=str, columns=6):
+    cols = st.columns(min(columns, max(len(options), 1)))
+    return [option for i, option in enumerate(options)
+            if cols[i % len(cols)].checkbox(format_option(option), value=True, key=f"{key_prefix}_{option}")]
 
 def show_latency():
-    @st.cache_data
     def load_data():
         try:
-            return pd.read_csv(f'{PROCESSED_DATA_FOLDER}/round_summary_adjusted.csv') ##path
+            return get_dataset('round_summary')
         except Exception as e:
             st.error(f"Error loading the data: {str(e)}")
             return None
 
-    df = load_data()
-    
-    st.title("Latency")
-
-
-    if df is not None:
-        def generate_statistics(df):
-            grouped = df.groupby('latency')
-            result_dfs = {}
-            
-            for latency, group in grouped:
-                unique_player_ips = group['player_ip'].unique()
-                latency_df = pd.DataFrame(index=unique_player_ips)
-                
-                group = group[group['latency'] == latency]
-                
-                for game_round in group['game_round'].unique():
-                    round_scores = group[group['game_round'] == game_round].set_index('player_ip')['score'].rename(f'Round_{game_round}')
-                    latency_df = latency_df.join(round_scores, how='left')
-                
-                latency_df['Mean'] = latency_df.mean(axis=1)
-                latency_df['StdDev'] = latency_df.std(axis=1)
-                
-                if 0 in result_dfs:
-                    latency_df['mean_difference'] = latency_df['Mean'] - result_dfs[0]['Mean']
-                else:
-                    latency_df['mean_difference'] = 0
-                
-                result_dfs[latency] = latency_df
-            
-            return result_dfs
-
-        result_dfs = generate_statistics(df)
+    # Filters live inside the fragment, so ticking a box reruns only the chart
+    # and table below instead of the whole page
+    @fragment
+    def latency_report(latency_values, all_players):
+        with st.expander("Filters", expanded=True):
+            # Baseline for the mean differences
+            baseline_latency = st.selectbox('Baseline latency (ms)', latency_values, index=0)
 
-        # st.title('Players\' Mean Scores vs Latency Statistical Analysis')
+            st.caption('Latency values (ms)')
+            selected_latencies = checkbox_columns(latency_values, 'latency')
 
-        # Create checkboxes for latency values
-        st.sidebar.subheader('Select Latency Values (ms)')
-        latency_values = list(result_dfs.keys())
-        selected_latencies = {latency: st.sidebar.checkbox(str(latency), value=True) for latency in latency_values}
+            st.caption('Players')
+            selected_players = checkbox_columns(all_players, 'player', lambda player: f'Player {player}')
 
-        # Create checkboxes for players
-        st.sidebar.subheader('Select Players')
-        all_players = df['player_ip'].unique()
-        selected_players = {player: st.sidebar.checkbox(f'Player {player}', value=True) for player in all_players}
+        # Cached on the filter values; the statistics themselves only on the baseline
+        means, shown = get_derived('latency_selection', ['round_summary'], select_statistics, baseline_latency,
+                                   tuple(selected_latencies), tuple(selected_players))
 
         # Create an interactive line plot
         fig = go.Figure()
 
         for player_ip in all_players:
-            if selected_players[player_ip]:
-                means = [result_dfs[latency].loc[player_ip, 'Mean'] for latency in latency_values if player_ip in result_dfs[latency].index and selected_latencies[latency]]
-                latencies = [latency for latency in latency_values if player_ip in result_dfs[latency].index and selected_latencies[latency]]
-                fig.add_trace(go.Scatter(x=latencies, y=means, mode='lines+markers', name=f'Player {player_ip}'))
+            if player_ip in means.index:
+                player_means = means.loc[player_ip].dropna()
+                fig.add_trace(go.Scatter(x=player_means.index, y=player_means.values, mode='lines+markers', name=f'Player {player_ip}'))
 
         fig.update_layout(
             title={
@@ -92,5 +113,22 @@ def show_latency():
 
         st.plotly_chart(fig, use_container_width=True)
 
+        # Statistics for the selected latencies and players
+        st.subheader('Score Statistics by Latency')
+        st.dataframe(shown.rename(columns={'mean_difference': f'Difference vs {baseline_latency}ms'}).round(2),
+                     use_container_width=True)
+
+    df = load_data()
+    
+    st.title("Latency")
+
+
+    if df is not None:
+        latency_values = sorted(df['latency'].dropna().unique())
+
+        # st.title('Players\' Mean Scores vs Latency Statistical Analysis')
+
+        latency_report(latency_values, list(df['player_ip'].unique()))
+
     else:
-        st.error("Cannot proceed with analysis due to data loading error.")
\ No newline at end of file
+        st.error("Cannot proceed with analysis due to data loading error.")
@@ -2,32 +2,71 @@ import streamlit as st
 import pandas as pd
 from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER
 import altair as alt
+from utils.datasets import get_derived
+from utils.ui import fragment
+
+def calculate_player_stats(df):
+    stats = df.groupby('player_ip', observed=True).agg({
+        'score': ['max', 'mean', 'sum'],
+        'game_round': ['first', 'last']  # To get the range of rounds
+    }).reset_index()
+    stats.columns = ['player_ip', 'highest_score', 'average_score', 'total_score', 'first_round', 'last_round']
+    stats['average_score'] = stats['average_score'].round(2)
+    
+    highest_score_rounds = df.loc[df.groupby('player_ip', observed=True)['score'].idxmax()][['player_ip', 'game_round', 'score']]
+    highest_score_rounds = highest_score_rounds.rename(columns={'game_round': 'highest_score_round'})
+    stats = stats.merge(highest_score_rounds, on='player_ip', suffixes=('', '_highest'))
+    
+    return stats
+
+def build_round_index(df):
+    # Round summary split by game_round and by map, with the per-player
+    # statistics of every view precomputed. Player statistics only depend on
+    # the player's own rows, so filtering them by player later gives the same
+    # result as computing them on the filtered data.
+    by_round = {game_round: group for game_round, group in df.groupby('game_round')}
+    by_map = {map_name: group for map_name, group in df.groupby('map')}
+    return {
+        'rounds': sorted(by_round),
+        'maps': sorted(by_map),
+        'players': sorted(df['player_ip'].unique()),
+        'by_round': by_round,
+        'by_map': by_map,
+        'stats_all': calculate_player_stats(df),
+        'stats_by_round': {game_round: calculate_player_stats(group) for game_round, group in by_round.items()},
+        'stats_by_map': {map_name: calculate_player_stats(group) for map_name, group in by_map.items()},
+    }
+
+def select_round_view(round_summary, view_option, selection, players):
+    """
+    Rows and per-player statistics of one view (all rounds, a round or a map)
+    restricted to the selected players.
+    """
+    round_index = get_derived('round_index', ['round_summary'], build_round_index)
+    if view_option == "All Rounds":
+        view_df, view_stats = round_summary, round_index['stats_all']
+    elif view_option == "By Round":
+        view_df, view_stats = round_index['by_round'][selection], round_index['stats_by_round'][selection]
+    else:  # By Map
+        view_df, view_stats = round_index['by_map'][selection], round_index['stats_by_map'][selection]
+    return (view_df[view_df['player_ip'].isin(players)],
+            view_stats[view_stats['player_ip'].isin(players)])
 
 def show_round():
 
+    # Indexed views of the round summary, rebuilt only when the pipeline rewrites it
     def load_data():
-        return pd.read_csv(f"{PROCESSED_DATA_FOLDER}/round_summary_adjusted.csv")  ##path
+        return get_derived('round_index', ['round_summary'], build_round_index)
 
     def checkbox_group(label, options, key_prefix, columns=3):
+        st.caption(label)
+        cols = st.columns(columns)
         selected = []
         for i, option in enumerate(options):
-            if st.sidebar.checkbox(str(option), value=True, key=f"{key_prefix}_{option}"):
+            if cols[i % columns].checkbox(str(option), value=True, key=f"{key_prefix}_{option}"):
                 selected.append(option)
         return selected
 
-    def calculate_player_stats(df):
-        stats = df.groupby('player_ip').agg({
-            'score': ['max', 'mean', 'sum'],
-            'game_round': ['first', 'last']  # To get the range of rounds
-        }).reset_index()
-        stats.columns = ['player_ip', 'highest_score', 'average_score', 'total_score', 'first_round', 'last_round']
-        stats['average_score'] = stats['average_score'].round(2)
-        
-        highest_score_rounds = df.loc[df.groupby('player_ip')['score'].idxmax()][['player_ip', 'game_round', 'score']]
-        highest_score_rounds = highest_score_rounds.rename(columns={'game_round': 'highest_score_round'})
-        stats = stats.merge(highest_score_rounds, on='player_ip', suffixes=('', '_highest'))
-        
-        return stats
 
     # Custom CSS for rounded boxes and responsive design
     st.markdown("""
@@ -64,37 +103,40 @@ def show_round():
     """, unsafe_allow_html=True)
 
     # Load data
-    df = load_data()
+    round_index = load_data()
 
     st.title("Round")
 
-    # View selection
-    st.sidebar.subheader("Select View")
-    view_option = st.sidebar.radio(
-        "Choose a view option",
-        ["All Rounds", "By Round", "By Map"],
-        index=0, label_visibility="collapsed"
-    )
-
-    if view_option == "All Rounds":
-        filtered_df = df
-    elif view_option == "By Round":
-        st.sidebar.subheader("Select Round")
-        selected_round = st.sidebar.selectbox("Choose a round", sorted(df['game_round'].unique()))
-        filtered_df = df[df['game_round'] == selected_round]
-    else:  # By Map
-        st.sidebar.subheader("Select Map")
-        selected_map = st.sidebar.radio("Choose a map", sorted(df['map'].unique()))
-        filtered_df = df[df['map'] == selected_map]
-
-    # Players checkboxes
-    st.sidebar.subheader("Select Players")
-    player_options = sorted(df['player_ip'].unique())
-    selected_players = checkbox_group("Choose players to display", player_options, "player")
-
-    # Apply player filter
-    filtered_df = filtered_df[filtered_df['player_ip'].isin(selected_players)]
-
+    # Filters and everything they affect rerun as a fragment, so changing the
+    # view or ticking a player does not rerun the whole page
+    @fragment
+    def round_report():
+        with st.expander("Filters", expanded=True):
+            # View selection
+            view_option = st.radio(
+                "Choose a view option",
+                ["All Rounds", "By Round", "By Map"],
+                index=0, horizontal=True
+            )
+
+            selection = None
+            if view_option == "By Round":
+                selection = st.selectbox("Choose a round", round_index['rounds'])
+            elif view_option == "By Map":
+                selection = st.radio("Choose a map", round_index['maps'], horizontal=True)
+
+            # Players checkboxes
+            player_options = round_index['players']
+            selected_players = checkbox_group("Choose players to display", player_options, "player", columns=6)
+
+        # Cached on the filter values
+        filtered_df, player_stats = get_derived('round_selection', ['round_summary'], select_round_view,
+                                                view_option, selection, tuple(selected_players))
+        show_round_view(view_option, selection, filtered_df, player_stats)
+
+    round_report()
+
+def show_round_view(view_option, selection, filtered_df, player_stats):
     # Create a line chart for player scores
     if view_option == "All Rounds":
         chart = alt.Chart(filtered_df).mark_line(point=True).encode(
@@ -116,7 +158,7 @@ def show_round():
         ).properties(
             width=700,
             height=400,
-            title=f'Player Scores for Round {selected_round}'
+            title=f'Player Scores for Round {selection}'
         ).interactive()
     else:  # By Map
         chart = alt.Chart(filtered_df).mark_line(point=True).encode(
@@ -127,7 +169,7 @@ def show_round():
         ).properties(
             width=700,
             height=400,
-            title=f'Player Scores for Map: {selected_map}'
+            title=f'Player Scores for Map: {selection}'
         ).interactive()
 
     st.altair_chart(chart, use_container_width=True)
@@ -144,8 +186,6 @@ def show_round():
     # Calculate and display player statistics
     st.subheader("Player Statistics")
     if not filtered_df.empty:
-        player_stats = calculate_player_stats(filtered_df)
-        
         # Custom CSS for styling
         st.markdown("""
         <style>
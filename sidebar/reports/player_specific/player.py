@@ -3,18 +3,43 @@ import pandas as pd
 from config import LOG_FOLDER, PROCESSED_DATA_FOLDER, RAW_DATA_FOLDER
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from utils.datasets import get_dataset
 
-def show_individual_player():
-    # File paths
-    input_path = f"{PROCESSED_DATA_FOLDER}/player_performance.csv" ##path
-    sb_summary = f"{PROCESSED_DATA_FOLDER}/round_summary_adjusted.csv" ##path
+# Background colour for each map; maps not listed here take the next fallback colour
+MAP_COLORS = {
+    'aggressor': 'rgba(255, 182, 193, 0.3)',  # Light pink
+    'wrackdm17': 'rgba(173, 216, 230, 0.3)',  # Light blue
+    'kaos2': 'rgba(144, 238, 144, 0.3)',  # Light green
+}
+FALLBACK_MAP_COLORS = [
+    'rgba(255, 218, 185, 0.3)',  # Peach
+    'rgba(221, 160, 221, 0.3)',  # Plum
+    'rgba(240, 230, 140, 0.3)',  # Khaki
+    'rgba(176, 196, 222, 0.3)',  # Steel blue
+]
+
+def map_color(map_name, unknown_maps):
+    if map_name in MAP_COLORS:
+        return MAP_COLORS[map_name]
+    return FALLBACK_MAP_COLORS[unknown_maps.index(map_name) % len(FALLBACK_MAP_COLORS)]
+
+def map_background_runs(data):
+    # Merge consecutive rounds played on the same map into (x0, x1, colour) spans
+    rounds = data[['game_round', 'map']].dropna().drop_duplicates('game_round').sort_values('game_round')
+    if rounds.empty:
+        return []
+
+    new_run = (rounds['map'] != rounds['map'].shift()) | (rounds['game_round'].diff() != 1)
+    runs = rounds.groupby(new_run.cumsum()).agg(first=('game_round', 'first'), last=('game_round', 'last'), map=('map', 'first'))
+    unknown_maps = sorted(set(runs['map']) - set(MAP_COLORS))
 
+    return [(first - 0.5, last + 0.5, map_color(map_name, unknown_maps))
+            for first, last, map_name in runs.itertuples(index=False)]
+
+def show_individual_player():
     # Load data
-    @st.cache_data
     def load_data():
-        df = pd.read_csv(input_path)
-        sb = pd.read_csv(sb_summary)
-        return df, sb
+        return get_dataset('player_performance'), get_dataset('round_summary')
 
     df, sb = load_data()
 
@@ -74,7 +99,7 @@ def show_individual_player():
         
         # Merge the data for combined analysis
         combined_data = pd.merge(player_pts, player_deaths.groupby('game_round')['deaths_total'].sum().reset_index(), 
-                                 on='game_round', how='outer').fillna(0)
+                                 on='game_round', how='outer').fillna({'score': 0, 'deaths_total': 0})
         
         # Highest score in a single round
         highest_score_round = combined_data.loc[combined_data['score'].idxmax()]
@@ -89,6 +114,7 @@ def show_individual_player():
         
         # Player killed by most
         killer_counts = player_deaths['killer_ip'].value_counts()
+        killer_counts = killer_counts[killer_counts > 0]
         top_killer = killer_counts.index[0] if not killer_counts.empty else "N/A"
         top_killer_count = killer_counts.iloc[0] if not killer_counts.empty else 0
 
@@ -135,21 +161,14 @@ def show_individual_player():
     # Function to add background colors based on map type
     def add_map_backgrounds(fig, data):
         if background_option == "Unhide":
-            for i, row in data.iterrows():
-                if row['map'] == 'aggressor':
-                    color = 'rgba(255, 182, 193, 0.3)'  # Light pink
-                elif row['map'] == 'wrackdm17':
-                    color = 'rgba(173, 216, 230, 0.3)'  # Light blue
-                else:  # kaos2
-                    color = 'rgba(144, 238, 144, 0.3)'  # Light green
-                
-                fig.add_vrect(
-                    x0=row['game_round'] - 0.5,
-                    x1=row['game_round'] + 0.5,
-                    fillcolor=color,
-                    layer="below",
-                    line_width=0,
-                )
+            # One shape per contiguous run of rounds on the same map, added in a
+            # single layout update instead of one add_vrect call per round
+            shapes = [
+                dict(type="rect", xref="x", yref="y domain", x0=x0, x1=x1, y0=0, y1=1,
+                     fillcolor=color, layer="below", line_width=0)
+                for x0, x1, color in map_background_runs(data)
+            ]
+            fig.update_layout(shapes=list(fig.layout.shapes) + shapes)
         return fig
 
     # Create two columns for the charts
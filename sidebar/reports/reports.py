@@ -1,12 +1,8 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
-from sidebar.reports.general import latency as general_latency
-from sidebar.reports.general import round as general_round
-from sidebar.reports.player_specific import player as player_specific
-from .general.latency import show_latency
-from .general.round import show_round
-from .player_specific.player import show_individual_player
-from .general.all_players import show_all_players
+
+# Report modules are imported when their report is selected, keeping the
+# Reports page itself cheap to load
 
 # st.set_page_config(page_title="Game Analysis Reports", page_icon="📊", layout="wide")
 
@@ -32,10 +28,13 @@ def show_reports():
         )
 
         if general_option == "Latency":
+            from .general.latency import show_latency
             show_latency()
         elif general_option == "Round":
+            from .general.round import show_round
             show_round()
         elif general_option == "Player Performance":
+            from .general.all_players import show_all_players
             show_all_players()
 
     elif selected_category == "Player-specific":
@@ -47,4 +46,5 @@ def show_reports():
         )
 
         if player_option == "Player Performance":
+            from .player_specific.player import show_individual_player
             show_individual_player()
@@ -0,0 +1,15 @@
+import numpy as np
+import pandas as pd
+
+from utils.event_windows import event_activity_features
+
+
+def test_flat_activity_has_no_time_since_input():
+    activity = pd.DataFrame({'timestamp': [100.0, 101.0, 102.0], 'mouse_clicks': [7, 7, 7]})
+    events = pd.DataFrame({'event_time': [101.5]})
+
+    features = event_activity_features(events, activity, ['mouse_clicks'], before=1.0, after=0.5)
+
+    assert np.isnan(features.loc[0, 'seconds_since_input'])
+    assert features.loc[0, 'mouse_clicks_before'] == 0
+    assert features.loc[0, 'window_covered']
@@ -0,0 +1,122 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow.csv as pv
+
+from config import ACTIVITY_CACHE_MAX_MB
+from utils.activity_store import ROLLUPS, read_converted_activity, rollup_activity, sort_activity, source_path
+from utils.profiling import count_cache, section
+
+
+def activity_path(ip_address):
+    return source_path(ip_address)
+
+
+def read_activity_table(key):
+    """
+    Load an activity table as immutable Arrow data. key is an IP address for
+    every sample, or (IP address, rollup name) for a rollup such as '1s'.
+
+    Files the activity watcher has converted are memory-mapped; until then
+    the CSV is parsed and rollups are built from the cached samples.
+    """
+    ip_address, rollup = key if isinstance(key, tuple) else (key, None)
+    table = read_converted_activity(ip_address, rollup)
+    if table is not None:
+        return table
+    if rollup is None:
+        return pv.read_csv(activity_path(ip_address))
+    return rollup_activity(sort_activity(get_activity_cache().get_table(ip_address)), ROLLUPS[rollup])
+
+
+class ActivityCache:
+    """
+    Process-wide LRU cache of activity tables bounded by a byte budget.
+
+    Tables are kept as Arrow data, which is immutable, so every hit hands out
+    a fresh DataFrame view over the same buffers instead of a pickled copy.
+    """
+
+    def __init__(self, max_bytes, loader=read_activity_table):
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_table(self, key):
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        count_cache('activity', table is not None)
+        if table is not None:
+            return table
+
+        # Load outside the lock so other sessions are not blocked on the I/O
+        with section('load'):
+            table = self.loader(key)
+        self.put(key, table)
+        return table
+
+    def get(self, key):
+        # Wrap the Arrow buffers without copying; assigning columns on the
+        # returned frame never touches the cached table
+        return self.get_table(key).to_pandas(types_mapper=pd.ArrowDtype)
+
+    def put(self, key, table):
+        size = table.nbytes
+        with self._lock:
+            if key in self._tables:
+                self.current_bytes -= self._tables.pop(key).nbytes
+            if size > self.max_bytes:
+                # Too big to ever fit; hand it out without keeping it resident
+                return
+            self._tables[key] = table
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._tables.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def evict(self, key=None):
+        """
+        Drop one entry, or everything when no key is given.
+        """
+        with self._lock:
+            keys = [key] if key is not None else list(self._tables)
+            for k in keys:
+                table = self._tables.pop(k, None)
+                if table is not None:
+                    self.current_bytes -= table.nbytes
+                    self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._tables),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_activity_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ActivityCache(ACTIVITY_CACHE_MAX_MB * 1024 * 1024)
+        return _cache
@@ -0,0 +1,332 @@
+import glob
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+
+from config import ACTIVITY_FOLDER, ACTIVITY_POLL_SECONDS, ACTIVITY_STORE_FOLDER
+from utils.jobs import get_job_manager
+
+# Every {ip}_activity_data.csv in ACTIVITY_FOLDER is converted into
+#   {ip}.{folder}.arrow         all samples in time order, in record batches of BATCH_ROWS
+#   {ip}.{folder}.{level}.arrow a pyramid of rollups, one per level in ROLLUPS: the
+#                               last sample of every bucket of that length
+# and registered in catalog.json under the CSV's path, with its signature and
+# its time span. Every file is sorted by timestamp, so a time range is found
+# with a binary search on the timestamp column (see activity_timeline on the
+# Analysis page) and no separate time index is kept. {folder} is a hash of
+# the CSV's folder, so activity folders that share a store (e.g. a load test's
+# synthetic files for the same players) never overwrite each other.
+# Like the processed datasets, the Arrow IPC files are memory-mapped, not parsed.
+ACTIVITY_SUFFIX = '_activity_data.csv'
+ARROW_SUFFIX = '.arrow'
+BATCH_ROWS = 64 * 1024
+# Rollup levels and their bucket length in seconds, finest first. The counters
+# are cumulative, so the difference between consecutive buckets of a level is
+# the number of presses in a bucket.
+ROLLUPS = {'100ms': 0.1, '1s': 1, '10s': 10, '60s': 60}
+CATALOG_FILE = 'catalog.json'
+
+# A new or changed file is converted once it has not been written to for this long
+SETTLE_SECONDS = 2
+
+_catalog = {'version': None, 'entries': {}}
+_catalog_lock = threading.Lock()
+
+
+def source_path(ip_address):
+    return os.path.join(ACTIVITY_FOLDER, f'{ip_address}{ACTIVITY_SUFFIX}')
+
+
+def catalog_key(path):
+    return os.path.abspath(path)
+
+
+def store_path(path, rollup=None):
+    """Where the converted samples of an activity CSV, or one of its rollups, are kept."""
+    ip_address = os.path.basename(path)[:-len(ACTIVITY_SUFFIX)]
+    folder = hashlib.sha1(os.path.dirname(catalog_key(path)).encode()).hexdigest()[:8]
+    name = f'{ip_address}.{folder}' if rollup is None else f'{ip_address}.{folder}.{rollup}'
+    return os.path.join(ACTIVITY_STORE_FOLDER, name + ARROW_SUFFIX)
+
+
+def catalog_path():
+    return os.path.join(ACTIVITY_STORE_FOLDER, CATALOG_FILE)
+
+
+def _signature(path):
+    stat = os.stat(path)
+    # A list, so it compares equal to the copy read back from the JSON catalog
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def sort_activity(table):
+    # Recordings are normally in time order already; the sort is stable either way
+    return table.take(pc.sort_indices(table, sort_keys=[('timestamp', 'ascending')]))
+
+
+def rollup_activity(table, seconds):
+    """
+    The last sample of every bucket of the given length from a time-sorted
+    table, stamped with the bucket start in epoch seconds.
+
+    Buckets come from the timestamps as pandas converts them, so they are the
+    same seconds the Analysis page gets from dt.floor('S').
+    """
+    if table.num_rows == 0:
+        return table
+    nanoseconds = pd.to_datetime(table['timestamp'].to_numpy(), unit='s').to_numpy().view('int64')
+    buckets = nanoseconds // round(seconds * 1_000_000_000)
+    last = np.flatnonzero(np.diff(buckets, append=buckets[-1] + 1))
+    rolled = table.take(pa.array(last))
+    column = rolled.schema.get_field_index('timestamp')
+    return rolled.set_column(column, 'timestamp', pa.array(buckets[last] * seconds, type=pa.float64()))
+
+
+def _write_table(table, path):
+    # Written next to the target and renamed into place, so a reader never maps a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix=ARROW_SUFFIX + '.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            with pa.ipc.new_file(file, table.schema) as writer:
+                writer.write_table(table, max_chunksize=BATCH_ROWS)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def convert_activity_file(path, progress=None):
+    """
+    Convert one activity CSV into the store and return its catalog entry.
+
+    Meant for a job worker. The entry records the CSV's signature from before
+    it was read, so a file that changes meanwhile is converted again.
+    """
+    signature = _signature(path)
+    if progress is not None:
+        progress(0.0, 'Reading CSV')
+    table = sort_activity(pv.read_csv(path))
+
+    os.makedirs(ACTIVITY_STORE_FOLDER, exist_ok=True)
+    if progress is not None:
+        progress(0.5, 'Writing samples')
+    _write_table(table, store_path(path))
+    for index, (name, seconds) in enumerate(ROLLUPS.items()):
+        if progress is not None:
+            progress(0.5 + 0.5 * index / len(ROLLUPS), f'Writing {name} rollup')
+        _write_table(rollup_activity(table, seconds), store_path(path, name))
+
+    timestamps = table['timestamp'].to_numpy()
+    return {
+        'signature': signature,
+        'rows': table.num_rows,
+        'columns': table.column_names,
+        'start': float(timestamps[0]) if len(timestamps) else None,
+        'end': float(timestamps[-1]) if len(timestamps) else None,
+        'rollups': list(ROLLUPS),
+        'converted': time.time(),
+    }
+
+
+def load_catalog():
+    """Catalog entries by CSV path, re-read only when the file changes."""
+    try:
+        stat = os.stat(catalog_path())
+    except FileNotFoundError:
+        return {}
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _catalog_lock:
+        if _catalog['version'] != version:
+            with open(catalog_path()) as file:
+                _catalog['entries'] = json.load(file)
+            _catalog['version'] = version
+        return _catalog['entries']
+
+
+def register(path, entry):
+    # Entries from before the catalog was keyed by path are dropped
+    entries = {key: value for key, value in load_catalog().items() if os.path.isabs(key)}
+    entries[catalog_key(path)] = entry
+    os.makedirs(ACTIVITY_STORE_FOLDER, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=ACTIVITY_STORE_FOLDER, suffix='.json.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(entries, file, indent=1)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, catalog_path())
+
+
+def catalog_entry(path):
+    """The catalog entry of an activity CSV, or None when it is missing or older than the CSV."""
+    entry = load_catalog().get(catalog_key(path))
+    if entry is None:
+        return None
+    try:
+        signature = _signature(path)
+    except FileNotFoundError:
+        return None
+    return entry if entry['signature'] == signature else None
+
+
+def read_converted_activity(ip_address, rollup=None):
+    """
+    Memory-map a player's converted samples, or one of their rollups; None
+    until the current CSV has been converted.
+    """
+    path = source_path(ip_address)
+    if catalog_entry(path) is None:
+        return None
+    try:
+        with pa.memory_map(store_path(path, rollup)) as source:
+            return pa.ipc.open_file(source).read_all()
+    except FileNotFoundError:
+        return None
+
+
+def _start_observer(folder, wake):
+    # File events through watchdog (inotify on Linux) when it is installed
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class WakeHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            wake.set()
+
+    observer = Observer()
+    observer.daemon = True
+    try:
+        observer.schedule(WakeHandler(), folder, recursive=False)
+        observer.start()
+    except OSError:
+        # e.g. the folder does not exist yet, or the inotify watch limit is reached
+        return None
+    return observer
+
+
+class ActivityWatcher:
+    """
+    Converts activity files in the background as they appear in the folder.
+
+    File events wake the watcher up straight away when watchdog is available;
+    the folder is also rescanned every interval, which is all that happens
+    without it. Conversions run on the shared job pool and are registered in
+    the catalog when they finish.
+    """
+
+    def __init__(self, folder=ACTIVITY_FOLDER, interval=ACTIVITY_POLL_SECONDS):
+        self.folder = folder
+        self.interval = interval
+        self.observer = None
+        self._jobs = {}
+        self._submitted = {}
+        self._errors = {}
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self.observer = _start_observer(self.folder, self._wake)
+                self._thread = threading.Thread(target=self._run, name='activity-watcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                unsettled = self.scan()
+                self.register_finished()
+            except Exception as e:
+                # e.g. an unreadable catalog or a broken job pool; the thread is never
+                # restarted, so log it and try again on the next scan
+                print(f"Activity watcher: {e!r}", file=sys.stderr)
+                unsettled = False
+            # Come back sooner while a file is still being written or converted
+            self._wake.wait(SETTLE_SECONDS if unsettled or self._jobs else self.interval)
+
+    def scan(self):
+        """
+        Queue every new or changed file that has settled; returns whether any
+        file was left for a later scan because it is still being written.
+        """
+        catalog = load_catalog()
+        unsettled = False
+        for path in sorted(glob.glob(os.path.join(self.folder, f'*{ACTIVITY_SUFFIX}'))):
+            ip_address = os.path.basename(path)[:-len(ACTIVITY_SUFFIX)]
+            stat = os.stat(path)
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = catalog.get(catalog_key(path), {})
+            # Entries from before a rollup level was added are converted again
+            if (path, *signature) in self._submitted or (entry.get('signature') == signature and
+                                                         entry.get('rollups') == list(ROLLUPS)):
+                continue
+            if time.time() - stat.st_mtime < SETTLE_SECONDS:
+                unsettled = True
+                continue
+            job_id = get_job_manager().submit(convert_activity_file, path,
+                                              name=f"Convert {os.path.basename(path)}")
+            with self._lock:
+                self._submitted[(path, *signature)] = job_id
+                self._jobs[job_id] = (ip_address, path)
+        return unsettled
+
+    def register_finished(self):
+        from utils.activity_cache import get_activity_cache
+
+        manager = get_job_manager()
+        with self._lock:
+            jobs = list(self._jobs.items())
+        for job_id, (ip_address, path) in jobs:
+            status = manager.status(job_id)
+            if status is not None and status['status'] in ('queued', 'running'):
+                continue
+            with self._lock:
+                del self._jobs[job_id]
+            if status is None:
+                continue
+            if status['status'] == 'done':
+                register(path, manager.result(job_id))
+                self._errors.pop(ip_address, None)
+                # Drop copies parsed from the CSV so the next lookup maps the converted files
+                for key in [ip_address] + [(ip_address, name) for name in ROLLUPS]:
+                    get_activity_cache().evict(key)
+            else:
+                # Not retried until the file changes
+                self._errors[ip_address] = status['error'] or status['status']
+                print(f"Activity watcher: converting {ip_address} failed: {self._errors[ip_address]}",
+                      file=sys.stderr)
+
+    def status(self):
+        with self._lock:
+            return {
+                'converted': sum(os.path.dirname(key) == os.path.abspath(self.folder) for key in load_catalog()),
+                'converting': len(self._jobs),
+                'failed': dict(self._errors),
+                'watching': 'file events' if self.observer is not None else f'polling every {self.interval:g}s',
+            }
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def get_activity_watcher():
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = ActivityWatcher()
+        return _watcher
@@ -0,0 +1,113 @@
+import numpy as np
+from scipy import stats
+
+# Upper bound on the number of resampled values held in memory at once
+MAX_CHUNK_ELEMENTS = 2_000_000
+
+
+def resample_means(data, n_resamples=10000, rng=None, max_chunk_elements=MAX_CHUNK_ELEMENTS):
+    """
+    Bootstrap distribution of the mean.
+
+    All resamples are drawn as one index matrix, split into row chunks so that
+    no more than max_chunk_elements indices are materialised at a time.
+    """
+    data = np.asarray(data, dtype=float)
+    rng = np.random.default_rng(rng)
+    n = len(data)
+    means = np.empty(n_resamples)
+    rows_per_chunk = max(1, max_chunk_elements // max(n, 1))
+
+    for start in range(0, n_resamples, rows_per_chunk):
+        stop = min(start + rows_per_chunk, n_resamples)
+        indices = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = data[indices].mean(axis=1)
+
+    return means
+
+
+def percentile_interval(boot_stats, confidence=0.95):
+    alpha = (1 - confidence) / 2
+    return tuple(np.percentile(boot_stats, [100 * alpha, 100 * (1 - alpha)]))
+
+
+def bca_interval(boot_stats, estimate, jackknife_stats, confidence=0.95):
+    """
+    Bias-corrected and accelerated interval from a bootstrap distribution and
+    the leave-one-out (jackknife) estimates of the same statistic.
+    """
+    alpha = (1 - confidence) / 2
+
+    # Bias correction: how far the bootstrap distribution is shifted from the estimate
+    proportion_below = np.mean(boot_stats < estimate) + np.mean(boot_stats == estimate) / 2
+    proportion_below = np.clip(proportion_below, 1 / (len(boot_stats) + 1), 1 - 1 / (len(boot_stats) + 1))
+    z0 = stats.norm.ppf(proportion_below)
+
+    # Acceleration: skewness of the jackknife estimates
+    deviations = jackknife_stats.mean() - jackknife_stats
+    denominator = 6 * np.sum(deviations ** 2) ** 1.5
+    acceleration = np.sum(deviations ** 3) / denominator if denominator > 0 else 0.0
+
+    z = stats.norm.ppf([alpha, 1 - alpha])
+    adjusted = stats.norm.cdf(z0 + (z0 + z) / (1 - acceleration * (z0 + z)))
+    return tuple(np.percentile(boot_stats, 100 * adjusted))
+
+
+def jackknife_means(data):
+    # Leave-one-out means without materialising n copies of the data
+    data = np.asarray(data, dtype=float)
+    n = len(data)
+    if n < 2:
+        return np.repeat(data.mean(), n)
+    return (data.sum() - data) / (n - 1)
+
+
+def bootstrap_mean_ci(data, n_resamples=10000, confidence=0.95, method='percentile', seed=None):
+    data = np.asarray(data, dtype=float)
+    boot_means = resample_means(data, n_resamples, rng=seed)
+    estimate = data.mean()
+
+    if method == 'bca':
+        ci_lower, ci_upper = bca_interval(boot_means, estimate, jackknife_means(data), confidence)
+    else:
+        ci_lower, ci_upper = percentile_interval(boot_means, confidence)
+
+    return {
+        'mean': estimate,
+        'std_error': boot_means.std(ddof=1),
+        'ci_lower': ci_lower,
+        'ci_upper': ci_upper,
+    }
+
+
+def bootstrap_mean_difference(data, baseline, n_resamples=10000, confidence=0.95, method='percentile', seed=None):
+    """
+    Bootstrap the difference of means (data - baseline) from two independent samples.
+    """
+    data = np.asarray(data, dtype=float)
+    baseline = np.asarray(baseline, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    boot_diffs = resample_means(data, n_resamples, rng=rng) - resample_means(baseline, n_resamples, rng=rng)
+    estimate = data.mean() - baseline.mean()
+
+    if method == 'bca':
+        # Leave out one observation at a time from either sample
+        jackknife_diffs = np.concatenate([
+            jackknife_means(data) - baseline.mean(),
+            data.mean() - jackknife_means(baseline),
+        ])
+        ci_lower, ci_upper = bca_interval(boot_diffs, estimate, jackknife_diffs, confidence)
+    else:
+        ci_lower, ci_upper = percentile_interval(boot_diffs, confidence)
+
+    # Two-sided bootstrap p-value for a zero difference
+    p_value = min(1.0, 2 * min(np.mean(boot_diffs <= 0), np.mean(boot_diffs >= 0)))
+
+    return {
+        'difference': estimate,
+        'std_error': boot_diffs.std(ddof=1),
+        'ci_lower': ci_lower,
+        'ci_upper': ci_upper,
+        'p_value': p_value,
+    }
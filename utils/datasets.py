@@ -0,0 +1,288 @@
+import errno
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from config import PROCESSED_DATA_FOLDER
+from utils.profiling import count_cache, section
+from utils.players import PLAYER_DICTIONARY_FILE, build_player_dictionary, encode_players
+
+# With copy-on-write, the shallow copies handed to pages share memory with the
+# cached frame, and any modification a page makes stays private to that page
+pd.set_option('mode.copy_on_write', True)
+
+# Each dataset can also be published as an uncompressed Arrow IPC file next to
+# its CSV (processes/16_arrow_datasets.py). Those are memory-mapped rather than
+# parsed: numeric and timestamp columns without nulls become read-only views of
+# the mapping, so their pages live in the OS page cache and are shared by every
+# server process instead of being copied into each one.
+ARROW_SUFFIX = '.arrow'
+
+# Outputs published by the ingest service (swap_datasets) each get a folder of
+# their own under VERSIONS_FOLDER, and the CURRENT_LINK symlink names the one
+# being served. A lookup resolves the link once and reads everything from that
+# folder. Without the link, datasets are read from PROCESSED_DATA_FOLDER itself,
+# which is where pipeline runs write (processes/run_all.py, or a staging run).
+VERSIONS_FOLDER = '.versions'
+CURRENT_LINK = 'current'
+# The previous version is kept, so a lookup that resolved the link just before
+# a swap can still read it
+KEEP_VERSIONS = 2
+
+# Processed outputs of the pipeline shared by the dashboard pages. Datasets
+# with encode_players hold their player columns as categoricals over the
+# player dictionary, so every page sees the same integer codes.
+DATASETS = {
+    'players': {
+        'file': PLAYER_DICTIONARY_FILE,
+        'read_options': {'keep_default_na': False},
+    },
+    'player_performance': {
+        'file': 'player_performance.csv',
+        'read_options': {'parse_dates': ['timestamp']},
+        'encode_players': True,
+    },
+    'round_summary': {
+        'file': 'round_summary_adjusted.csv',
+        'read_options': {},
+        'encode_players': True,
+    },
+    'player_round_stats': {
+        'file': 'player_round_stats.csv',
+        'read_options': {},
+        'encode_players': True,
+    },
+    'player_stats': {
+        'file': 'player_stats.csv',
+        'read_options': {},
+        'encode_players': True,
+    },
+}
+
+_frames = {}
+_derived = {}
+# Derived values keyed on filter selections can have many variants; keep the
+# most recently built ones per name
+DERIVED_VARIANTS = 64
+_lock = threading.Lock()
+
+
+def data_folder():
+    """The folder the dashboard reads the processed datasets from."""
+    try:
+        return os.path.join(PROCESSED_DATA_FOLDER, os.readlink(os.path.join(PROCESSED_DATA_FOLDER, CURRENT_LINK)))
+    except OSError:
+        # No link (or not a link): nothing has been published
+        return PROCESSED_DATA_FOLDER
+
+
+def dataset_path(name, folder=None):
+    return os.path.join(folder or data_folder(), DATASETS[name]['file'])
+
+
+def arrow_path(name, folder=None):
+    return os.path.splitext(dataset_path(name, folder))[0] + ARROW_SUFFIX
+
+
+def _source(name, folder):
+    """
+    The file a dataset is read from and its stat: the Arrow copy when it is at
+    least as new as the CSV, otherwise the CSV (e.g. while the pipeline is
+    part-way through a run, or before the Arrow stage has ever run).
+    """
+    csv_stat = os.stat(dataset_path(name, folder))
+    try:
+        arrow_stat = os.stat(arrow_path(name, folder))
+    except FileNotFoundError:
+        arrow_stat = None
+    if arrow_stat is not None and arrow_stat.st_mtime_ns >= csv_stat.st_mtime_ns:
+        return arrow_path(name, folder), arrow_stat
+    return dataset_path(name, folder), csv_stat
+
+
+def dataset_version(name, folder=None):
+    """
+    Signature of the file currently on disk. It changes whenever the pipeline
+    rewrites the output or a new version is published, which is what
+    invalidates the cached frame.
+    """
+    path, stat = _source(name, folder or data_folder())
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def _player_dictionary(frame, folder):
+    try:
+        return _get_dataset('players', folder)
+    except FileNotFoundError:
+        # Outputs from before the dictionary existed; derive codes from the table itself
+        return build_player_dictionary(frame)
+
+
+def read_csv_dataset(name, folder=None):
+    folder = folder or data_folder()
+    frame = pd.read_csv(dataset_path(name, folder), **DATASETS[name]['read_options'])
+    if DATASETS[name].get('encode_players'):
+        frame = encode_players(frame, _player_dictionary(frame, folder))
+    return frame
+
+
+def read_arrow_dataset(name, path=None):
+    # split_blocks keeps each column in its own block, which is what lets
+    # pandas wrap the mapped buffers instead of consolidating them into copies
+    with pa.memory_map(path or arrow_path(name)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def publish_arrow_dataset(name):
+    """
+    Write the Arrow copy of a dataset from its CSV; returns the path.
+
+    Player categoricals are stored as dictionary columns, so they come back
+    with the same codes. The file is written next to the target and renamed
+    into place, so a reader never maps a partial file.
+    """
+    # Written by the pipeline, which always works in PROCESSED_DATA_FOLDER itself
+    frame = read_csv_dataset(name, PROCESSED_DATA_FOLDER)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    path = arrow_path(name, PROCESSED_DATA_FOLDER)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix=ARROW_SUFFIX + '.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            with pa.ipc.new_file(file, table.schema) as writer:
+                writer.write_table(table)
+        # mkstemp creates the file private to this user; the CSVs are world-readable
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+def _read(name, path, folder):
+    if path.endswith(ARROW_SUFFIX):
+        return read_arrow_dataset(name, path)
+    return read_csv_dataset(name, folder)
+
+
+def _get_dataset(name, folder):
+    version = dataset_version(name, folder)
+    with _lock:
+        cached = _frames.get(name)
+    hit = cached is not None and cached[0] == version
+    count_cache('datasets', hit)
+    if not hit:
+        with section('load'):
+            frame = _read(name, version[0], folder)
+        with _lock:
+            _frames[name] = (version, frame)
+        cached = (version, frame)
+    return cached[1].copy(deep=False)
+
+
+def get_dataset(name):
+    """
+    Load a processed dataset once per process and return a cheap view of it.
+
+    The file is only re-read when its mtime or size changes. Callers get a
+    shallow copy; thanks to copy-on-write they can add or overwrite columns
+    without copying the data up front or affecting other pages and sessions.
+    """
+    return _get_dataset(name, data_folder())
+
+
+def get_derived(name, sources, build, *args):
+    """
+    Cache a value computed from one or more datasets, e.g. a pivot or an index.
+
+    build(*source_frames, *args) is called once per distinct args and again
+    only when one of the source files changes, so derived tables are
+    invalidated automatically after a pipeline run. args must be hashable;
+    at most DERIVED_VARIANTS sets of args are kept per name.
+    """
+    key = (name, args)
+    # Every source comes from the same published version
+    folder = data_folder()
+    versions = tuple(dataset_version(source, folder) for source in sources)
+    with _lock:
+        cached = _derived.get(key)
+    hit = cached is not None and cached[0] == versions
+    count_cache('derived', hit)
+    if not hit:
+        value = build(*[_get_dataset(source, folder) for source in sources], *args)
+        with _lock:
+            _derived.pop(key, None)
+            _derived[key] = (versions, value)
+            variants = [other for other in _derived if other[0] == name]
+            for other in variants[:-DERIVED_VARIANTS]:
+                del _derived[other]
+        cached = (versions, value)
+
+    value = cached[1]
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+def check_file_system(folder):
+    """Raise EXDEV unless folder can be renamed into PROCESSED_DATA_FOLDER."""
+    os.makedirs(PROCESSED_DATA_FOLDER, exist_ok=True)
+    if os.stat(folder).st_dev != os.stat(PROCESSED_DATA_FOLDER).st_dev:
+        raise OSError(errno.EXDEV, f"{folder} is not on the same file system as {PROCESSED_DATA_FOLDER}")
+
+
+def swap_datasets(folder):
+    """
+    Publish a complete set of pipeline outputs from folder and switch the
+    dashboard to it.
+
+    folder is renamed into a version folder of its own, then the CURRENT_LINK
+    symlink is replaced in a single rename. A lookup resolves the link once,
+    so it reads either the old set or the new one, never a mix. folder must be
+    on the same file system as PROCESSED_DATA_FOLDER.
+    """
+    check_file_system(folder)
+    versions = os.path.join(PROCESSED_DATA_FOLDER, VERSIONS_FOLDER)
+    os.makedirs(versions, exist_ok=True)
+    # Named by publish time down to the nanosecond, so they sort oldest first
+    # even within a second; renaming over the empty folder claims the name
+    now = time.time_ns()
+    prefix = time.strftime('%Y%m%d-%H%M%S-', time.localtime(now // 10**9)) + f'{now % 10**9:09d}-'
+    version = tempfile.mkdtemp(dir=versions, prefix=prefix)
+    os.replace(folder, version)
+
+    link = os.path.join(PROCESSED_DATA_FOLDER, CURRENT_LINK)
+    tmp_link = f'{link}.{os.path.basename(version)}.tmp'
+    os.symlink(os.path.relpath(version, PROCESSED_DATA_FOLDER), tmp_link)
+    os.replace(tmp_link, link)
+
+    # The new version's frames are cached under new signatures; drop the old ones
+    clear_datasets()
+    for old in sorted(os.listdir(versions))[:-KEEP_VERSIONS]:
+        if old == os.path.basename(version):
+            continue
+        shutil.rmtree(os.path.join(versions, old), ignore_errors=True)
+
+
+def serve_processed_folder():
+    """
+    Serve the files directly in PROCESSED_DATA_FOLDER again, e.g. after the
+    pipeline has been run there by hand. Published versions are kept.
+    """
+    try:
+        os.remove(os.path.join(PROCESSED_DATA_FOLDER, CURRENT_LINK))
+    except FileNotFoundError:
+        pass
+    clear_datasets()
+
+
+def clear_datasets():
+    with _lock:
+        _frames.clear()
+        _derived.clear()
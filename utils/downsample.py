@@ -0,0 +1,94 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# Upper bound on points sent to the browser per curve
+MAX_POINTS = 2000
+
+# Above this many points a trace is drawn with WebGL instead of SVG
+WEBGL_THRESHOLD = 1000
+
+
+def rank_grid(n, max_points=MAX_POINTS):
+    """
+    Evenly spaced ranks 0..n-1 (both ends included), i.e. a quantile grid over
+    sorted data. Returns every rank when n already fits.
+    """
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+
+
+def cdf_points(data, max_points=MAX_POINTS):
+    """
+    Empirical CDF reduced to at most max_points points.
+
+    Count data has few distinct values, so the exact step shape is kept by
+    emitting the first and last rank of every distinct value. Otherwise the
+    curve is sampled on a quantile grid.
+    """
+    sorted_data = np.sort(np.asarray(data, dtype=float))
+    n = len(sorted_data)
+    if n == 0:
+        return sorted_data, sorted_data
+
+    values, first, counts = np.unique(sorted_data, return_index=True, return_counts=True)
+    if 2 * len(values) <= max_points:
+        last = first + counts - 1
+        ranks = np.unique(np.concatenate([first, last]))
+    else:
+        ranks = rank_grid(n, max_points)
+
+    return sorted_data[ranks], (ranks + 1) / n
+
+
+def qq_points(theoretical, ordered, max_points=MAX_POINTS):
+    # probplot output is already sorted, so thinning by rank keeps both tails
+    ranks = rank_grid(len(ordered), max_points)
+    return np.asarray(theoretical)[ranks], np.asarray(ordered)[ranks]
+
+
+def lttb(x, y, threshold=MAX_POINTS):
+    """
+    Largest-Triangle-Three-Buckets downsampling for time series.
+
+    x must be sorted. Datetime x values are supported; the returned arrays are
+    subsets of the inputs, so peaks and troughs are drawn at their real positions.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    x_num = x.astype('datetime64[ns]').astype(np.int64).astype(float) if np.issubdtype(x.dtype, np.datetime64) else x.astype(float)
+
+    # Interior points are split into threshold - 2 buckets; first and last points are always kept
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket is the third vertex of the triangle
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x_num[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+
+        bucket_x = x_num[start:stop]
+        bucket_y = y[start:stop]
+        areas = np.abs((x_num[previous] - next_x) * (bucket_y - y[previous])
+                       - (x_num[previous] - bucket_x) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return x[selected], y[selected]
+
+
+def scatter(x, y, **kwargs):
+    """
+    go.Scatter for small traces, go.Scattergl once a trace exceeds WEBGL_THRESHOLD points.
+    """
+    trace_type = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    return trace_type(x=x, y=y, **kwargs)
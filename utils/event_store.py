@@ -0,0 +1,343 @@
+import os
+import sqlite3
+import tempfile
+
+import pandas as pd
+
+from config import EVENT_STORE_FILE, EVENT_STORE_PATH
+from utils.datasets import data_folder
+from utils.players import PLAYER_COLUMNS, encode_players, extend_player_dictionary, player_codes
+
+# Embedded SQLite copy of the processed session for ad-hoc queries. The
+# pipeline publishes it (processes/15_event_store.py); pages and scripts read
+# it through the functions below, which only pull the matching rows. Readers
+# open EVENT_STORE_FILE in the folder the datasets are served from, so a
+# published run switches the store together with the datasets.
+#
+# Players are stored as integer codes from the player dictionary, which is the
+# players table. Filters and output columns can still name players: killer_ip,
+# victim_ip and player_ip are translated to and from the code columns.
+NAME_COLUMNS = {'killer_ip': 'killer_code', 'victim_ip': 'victim_code', 'player_ip': 'player_code'}
+
+SCHEMA = {
+    'players': {
+        'columns': [
+            ('player_code', 'INTEGER PRIMARY KEY'),
+            ('player_name', 'TEXT'),
+        ],
+        'indexes': [('player_name',)],
+    },
+    'events': {
+        'columns': [
+            ('timestamp', 'TEXT'),
+            ('game_round', 'INTEGER'),
+            ('map', 'TEXT'),
+            ('latency', 'INTEGER'),
+            ('event', 'TEXT'),
+            ('killer_id', 'INTEGER'),
+            ('victim_id', 'INTEGER'),
+            ('weapon_id', 'INTEGER'),
+            ('killer_code', 'INTEGER'),
+            ('victim_code', 'INTEGER'),
+            ('weapon', 'TEXT'),
+            ('player_id', 'INTEGER'),
+            ('score', 'INTEGER'),
+            ('player_code', 'INTEGER'),
+            ('points', 'INTEGER'),
+            ('log_score', 'INTEGER'),
+            ('log_line', 'TEXT'),
+        ],
+        'indexes': [('game_round', 'player_code'), ('killer_code',), ('victim_code',), ('latency',), ('map',),
+                    ('weapon',), ('timestamp',)],
+    },
+    'rounds': {
+        'columns': [
+            ('game_round', 'INTEGER PRIMARY KEY'),
+            ('map', 'TEXT'),
+            ('latency', 'INTEGER'),
+            ('start_time', 'TEXT'),
+            ('end_time', 'TEXT'),
+            ('events', 'INTEGER'),
+            ('kills', 'INTEGER'),
+        ],
+        'indexes': [('latency',), ('map',), ('start_time',)],
+    },
+    'scoreboards': {
+        'columns': [
+            ('game_round', 'INTEGER'),
+            ('map', 'TEXT'),
+            ('latency', 'INTEGER'),
+            ('player_id', 'INTEGER'),
+            ('player_code', 'INTEGER'),
+            ('score', 'INTEGER'),
+        ],
+        'indexes': [('game_round', 'player_code'), ('player_code',), ('latency',), ('map',)],
+    },
+    'kill_edges': {
+        'columns': [
+            ('timestamp', 'TEXT'),
+            ('game_round', 'INTEGER'),
+            ('map', 'TEXT'),
+            ('latency', 'INTEGER'),
+            ('killer_code', 'INTEGER'),
+            ('victim_code', 'INTEGER'),
+            ('weapon', 'TEXT'),
+        ],
+        'indexes': [('game_round', 'killer_code'), ('game_round', 'victim_code'), ('killer_code',),
+                    ('victim_code',), ('latency',), ('map',), ('weapon',), ('timestamp',)],
+    },
+}
+
+
+def build_rounds(events):
+    grouped = events.groupby('game_round', sort=True)
+    rounds = grouped.agg(
+        map=('map', 'first'),
+        latency=('latency', 'first'),
+        start_time=('timestamp', 'min'),
+        end_time=('timestamp', 'max'),
+        events=('timestamp', 'size'),
+    )
+    rounds['kills'] = (events['event'] == 'Kill').groupby(events['game_round']).sum()
+    return rounds.reset_index()
+
+
+def build_kill_edges(events):
+    kills = events[events['event'] == 'Kill']
+    return kills[['timestamp', 'game_round', 'map', 'latency', 'killer_code', 'victim_code', 'weapon']]
+
+
+def with_player_codes(frame, dictionary):
+    """frame with a code column next to each player name column; missing players get NA."""
+    encoded = encode_players(frame, dictionary)
+    frame = frame.copy(deep=False)
+    for name, code in NAME_COLUMNS.items():
+        if name in frame.columns:
+            codes = player_codes(encoded[name])
+            frame[code] = codes.where(codes >= 0).astype('Int64')
+    return frame
+
+
+def _create_table(conn, table):
+    spec = SCHEMA[table]
+    columns = ', '.join(f'{name} {kind}' for name, kind in spec['columns'])
+    conn.execute(f'CREATE TABLE {table} ({columns})')
+
+
+def _create_indexes(conn, table):
+    for columns in SCHEMA[table]['indexes']:
+        index = f"idx_{table}_{'_'.join(columns)}"
+        conn.execute(f"CREATE INDEX {index} ON {table} ({', '.join(columns)})")
+
+
+def _insert(conn, table, frame):
+    names = [name for name, _ in SCHEMA[table]['columns']]
+    frame = frame.reindex(columns=names)
+    # Whole-number floats (NaN-padded ints from the CSVs) go in as integers
+    for name, kind in SCHEMA[table]['columns']:
+        if kind.startswith('INTEGER'):
+            frame[name] = pd.to_numeric(frame[name], errors='coerce').astype('Int64')
+    rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+    placeholders = ', '.join('?' for _ in names)
+    conn.executemany(f"INSERT INTO {table} ({', '.join(names)}) VALUES ({placeholders})", rows)
+
+
+def publish(events, scoreboards, players, path=None):
+    """
+    Write a fresh event store from the cleaned events, the round scoreboards
+    and the player dictionary. Names missing from the dictionary get codes
+    appended after the known ones, as encode_players does.
+
+    The database is built next to the target and swapped in with os.replace,
+    so readers never see a half-written store. Indexes are created after the
+    bulk insert, which is much faster than maintaining them row by row.
+    """
+    path = path or EVENT_STORE_PATH
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+
+    names = pd.concat([frame[column] for frame in (events, scoreboards)
+                       for column in PLAYER_COLUMNS if column in frame.columns])
+    players = extend_player_dictionary(players, names)
+    events = with_player_codes(events, players)
+    scoreboards = with_player_codes(scoreboards, players)
+
+    tables = {
+        'players': players,
+        'events': events,
+        'rounds': build_rounds(events),
+        'scoreboards': scoreboards,
+        'kill_edges': build_kill_edges(events),
+    }
+
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.db.tmp')
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            with conn:
+                for table, frame in tables.items():
+                    _create_table(conn, table)
+                    _insert(conn, table, frame)
+                    _create_indexes(conn, table)
+            conn.execute('ANALYZE')
+            conn.execute('PRAGMA journal_mode=WAL')
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {table: len(frame) for table, frame in tables.items()}
+
+
+def store_path():
+    return os.path.join(data_folder(), EVENT_STORE_FILE)
+
+
+def connect(path=None, readonly=True):
+    path = path or store_path()
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Event store not found at {path}. Run processes/15_event_store.py first.")
+    if readonly:
+        uri = f"file:{os.path.abspath(path)}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    return conn
+
+
+def query(sql, params=(), path=None):
+    """Run a read-only SQL statement against the store and return a DataFrame."""
+    conn = connect(path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+def _name_column(table, column):
+    # The code column a player name column stands for in this table, if any
+    known = {name for name, _ in SCHEMA[table]['columns']}
+    code = NAME_COLUMNS.get(column)
+    return code if column not in known and code in known else None
+
+
+def _columns(table):
+    stored = [name for name, _ in SCHEMA[table]['columns']]
+    return stored + [name for name in NAME_COLUMNS if _name_column(table, name)]
+
+
+def _expression(table, column):
+    # Player names are looked up through the players table by code
+    code = _name_column(table, column)
+    if code is None:
+        return column
+    return f"(SELECT player_name FROM players WHERE player_code = {table}.{code}) AS {column}"
+
+
+def _resolve_players(table, filters, path=None):
+    # Swap player name filters for code filters, looking the names up in the
+    # players table first: a literal code list lets SQLite use the code indexes
+    resolved = {}
+    for column, value in filters.items():
+        code = _name_column(table, column)
+        if code is None or value is None:
+            resolved[column] = value
+            continue
+        names = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        sql = f"SELECT player_code FROM players WHERE player_name IN ({', '.join('?' for _ in names)})"
+        # -1 is never a stored code, so unknown names match nothing
+        resolved[code] = query(sql, names, path)['player_code'].tolist() or [-1]
+    return resolved
+
+
+def _where(table, filters, start=None, end=None):
+    known = {name for name, _ in SCHEMA[table]['columns']}
+    clauses = []
+    params = []
+    for column, value in filters.items():
+        if value is None:
+            continue
+        if column not in known:
+            raise ValueError(f"Unknown column '{column}' for table '{table}'")
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        else:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    if start is not None:
+        clauses.append('timestamp >= ?')
+        params.append(str(pd.Timestamp(start)))
+    if end is not None:
+        clauses.append('timestamp <= ?')
+        params.append(str(pd.Timestamp(end)))
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+    return where, params
+
+
+def select(table, columns=None, start=None, end=None, limit=None, path=None, **filters):
+    """
+    Fetch rows of one table matching equality filters.
+
+    Filters are column=value pairs; a list or tuple means "any of". start/end
+    bound the timestamp column of the events and kill_edges tables. Players
+    can be given by name (killer_ip, victim_ip, player_ip) or by code, and the
+    name columns can be asked for in columns; by default only codes come back.
+
+        select('kill_edges', killer_ip='Player_138.25.249.38', weapon='MOD_ROCKET',
+               latency=80, map='aggressor')
+    """
+    if table not in SCHEMA:
+        raise ValueError(f"Unknown table '{table}'")
+    columns = columns or [name for name, _ in SCHEMA[table]['columns']]
+    unknown = set(columns) - set(_columns(table))
+    if unknown:
+        raise ValueError(f"Unknown columns {sorted(unknown)} for table '{table}'")
+
+    where, params = _where(table, _resolve_players(table, filters, path), start, end)
+    sql = f"SELECT {', '.join(_expression(table, column) for column in columns)} FROM {table}{where}"
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(int(limit))
+    return query(sql, params, path)
+
+
+def events(**filters):
+    return select('events', **filters)
+
+
+def kills(**filters):
+    return select('kill_edges', **filters)
+
+
+def scoreboard(**filters):
+    return select('scoreboards', **filters)
+
+
+def rounds(**filters):
+    return select('rounds', **filters)
+
+
+def players(**filters):
+    return select('players', **filters)
+
+
+def kill_counts(by=('killer_ip', 'victim_ip'), start=None, end=None, path=None, **filters):
+    """
+    Number of kills grouped by the given kill_edges columns, computed in
+    SQLite. Player name columns are grouped on their codes and named after.
+    """
+    by = list(by)
+    unknown = set(by) - set(_columns('kill_edges'))
+    if unknown:
+        raise ValueError(f"Unknown columns {sorted(unknown)} for table 'kill_edges'")
+    where, params = _where('kill_edges', _resolve_players('kill_edges', filters, path), start, end)
+    group = ', '.join(_name_column('kill_edges', column) or column for column in by)
+    selected = ', '.join(_expression('kill_edges', column) for column in by)
+    sql = (f"SELECT {selected}, COUNT(*) AS kills FROM kill_edges{where} "
+           f"GROUP BY {group} ORDER BY kills DESC")
+    return query(sql, params, path)
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+INPUT_COLUMNS = ['mouse_clicks', 'SPACE', 'A', 'W', 'S', 'D']
+
+
+def to_epoch_seconds(timestamps):
+    """
+    Epoch seconds for a timestamp column. Naive values are taken as UTC,
+    matching how the Analysis page interprets the game log times.
+    """
+    timestamps = pd.to_datetime(timestamps)
+    if timestamps.dt.tz is None:
+        timestamps = timestamps.dt.tz_localize('UTC')
+    return timestamps.dt.tz_convert('UTC').astype('int64').to_numpy() / 1e9
+
+
+def player_events(player_performance, player):
+    """
+    All kill and death events of one player, in time order.
+
+    A kill is any event where the player killed someone else; a death is any
+    event where the player was the victim (including suicides and <world>).
+    """
+    kills = player_performance[(player_performance['killer_ip'] == player) &
+                               (player_performance['victim_ip'] != player)]
+    deaths = player_performance[player_performance['victim_ip'] == player]
+
+    events = pd.concat([kills.assign(event_type='kill'), deaths.assign(event_type='death')])
+    events = events[['timestamp', 'game_round', 'map', 'latency', 'killer_ip', 'victim_ip', 'event_type']]
+    events = events.assign(player=player, event_time=to_epoch_seconds(events['timestamp']))
+    return events.sort_values('event_time', kind='stable').reset_index(drop=True)
+
+
+def _asof_values(times, counters, query_times):
+    # Value of each cumulative counter as of query_times: the last sample at or
+    # before each query. Queries before the first sample read as that sample.
+    idx = np.searchsorted(times, query_times, side='right') - 1
+    return counters[np.clip(idx, 0, len(times) - 1)]
+
+
+def event_activity_features(events, activity, columns=INPUT_COLUMNS, before=5.0, after=5.0):
+    """
+    Input activity in the windows (t - before, t] and (t, t + after] around each event.
+
+    events needs an event_time column in epoch seconds and activity needs the
+    raw timestamp column plus cumulative counter columns. Everything is done
+    with one searchsorted per window edge, so cost is O(events * log(samples)).
+    """
+    times = np.asarray(activity['timestamp'], dtype=float)
+    counters = np.column_stack([np.asarray(activity[column], dtype=float) for column in columns])
+
+    if len(times) > 1 and np.any(np.diff(times) < 0):
+        order = np.argsort(times, kind='stable')
+        times, counters = times[order], counters[order]
+
+    event_times = events['event_time'].to_numpy(dtype=float)
+    features = events.copy()
+
+    if len(times) == 0:
+        for column in columns:
+            features[f'{column}_before'] = np.nan
+            features[f'{column}_after'] = np.nan
+        features['seconds_since_input'] = np.nan
+        features['window_covered'] = False
+        return features
+
+    at_start = _asof_values(times, counters, event_times - before)
+    at_event = _asof_values(times, counters, event_times)
+    at_end = _asof_values(times, counters, event_times + after)
+
+    for i, column in enumerate(columns):
+        features[f'{column}_before'] = at_event[:, i] - at_start[:, i]
+        features[f'{column}_after'] = at_end[:, i] - at_event[:, i]
+        features[f'{column}_rate_before'] = features[f'{column}_before'] / before
+        features[f'{column}_rate_after'] = features[f'{column}_after'] / after
+
+    # Time since the last sample where any counter moved
+    changed = np.flatnonzero(np.any(np.diff(counters, axis=0) != 0, axis=1)) + 1
+    change_times = times[changed]
+    if len(change_times) == 0:
+        # No counter ever moved, e.g. an idle player or a single sample
+        features['seconds_since_input'] = np.nan
+    else:
+        last_change = np.searchsorted(change_times, event_times, side='right') - 1
+        features['seconds_since_input'] = np.where(
+            last_change >= 0, event_times - change_times[np.clip(last_change, 0, None)], np.nan
+        )
+
+    features['window_covered'] = (event_times - before >= times[0]) & (event_times + after <= times[-1])
+    return features
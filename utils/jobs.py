@@ -0,0 +1,181 @@
+import itertools
+import multiprocessing
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import JOB_WORKERS, JOB_HISTORY
+
+# Worker processes are spawned rather than forked: the pool is first used from
+# the server's background threads, and a fork copies any lock another thread
+# holds at that moment into a child that can never release it
+_context = multiprocessing.get_context('spawn')
+
+
+@contextmanager
+def _without_main():
+    # A spawned process first re-runs the parent's __main__ from its file.
+    # Under Streamlit that is the page script, which would start the whole app
+    # in every worker, so a blank module stands in while processes are started
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+class ProgressReporter:
+    """
+    Picklable callback handed to a job so it can report progress from a
+    worker process: reporter(fraction, message).
+    """
+
+    def __init__(self, job_id, progress_store):
+        self.job_id = job_id
+        self.progress_store = progress_store
+
+    def __call__(self, fraction, message=''):
+        self.progress_store[self.job_id] = (float(fraction), message)
+
+
+class JobManager:
+    """
+    Runs functions on a process pool and keeps their status, progress and
+    results in a store shared by every session of this server process.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, history=JOB_HISTORY):
+        self.max_workers = max_workers
+        self.history = history
+        self._executor = None
+        self._manager = None
+        self._progress = None
+        self._jobs = OrderedDict()
+        self._keys = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # The pool and the progress manager are started on first use only
+        if self._manager is None:
+            self._manager = _context.Manager()
+            self._progress = self._manager.dict()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_context)
+
+    def submit(self, fn, *args, name=None, key=None, **kwargs):
+        """
+        Queue fn(*args, progress=reporter, **kwargs) and return its job ID.
+
+        When key is given and a job with the same key is queued, running or
+        finished successfully, that job's ID is returned instead of resubmitting.
+        """
+        with self._lock:
+            if key is not None and key in self._keys:
+                job_id = self._keys[key]
+                if self._status(self._jobs[job_id]) != 'failed':
+                    return job_id
+
+            job_id = f'job-{next(self._ids)}'
+            # The pool starts its workers as jobs are submitted
+            with _without_main():
+                self._start()
+                reporter = ProgressReporter(job_id, self._progress)
+                try:
+                    future = self._executor.submit(fn, *args, progress=reporter, **kwargs)
+                except BrokenProcessPool:
+                    # A worker died, e.g. killed for running out of memory. The jobs
+                    # it took down fail with the same error; new ones get a new pool
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+                    self._start()
+                    future = self._executor.submit(fn, *args, progress=reporter, **kwargs)
+            self._jobs[job_id] = {
+                'id': job_id,
+                'name': name or getattr(fn, '__name__', 'job'),
+                'key': key,
+                'submitted': time.time(),
+                'future': future,
+            }
+            if key is not None:
+                self._keys[key] = job_id
+            self._trim()
+            return job_id
+
+    def _status(self, job):
+        future = job['future']
+        if future.cancelled():
+            return 'cancelled'
+        if future.done():
+            return 'failed' if future.exception() is not None else 'done'
+        if future.running() or job['id'] in self._progress:
+            return 'running'
+        return 'queued'
+
+    def _trim(self):
+        # Forget the oldest finished jobs beyond the history limit
+        finished = [job_id for job_id, job in self._jobs.items() if job['future'].done()]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            job = self._jobs.pop(job_id)
+            self._progress.pop(job_id, None)
+            if job['key'] is not None and self._keys.get(job['key']) == job_id:
+                del self._keys[job['key']]
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            fraction, message = self._progress.get(job_id, (0.0, ''))
+            status = self._status(job)
+            if status == 'done':
+                fraction = 1.0
+            return {
+                'id': job_id,
+                'name': job['name'],
+                'status': status,
+                'progress': fraction,
+                'message': message,
+                'submitted': job['submitted'],
+                'error': (str(job['future'].exception()) if status == 'failed' else
+                          'The job was cancelled' if status == 'cancelled' else None),
+            }
+
+    def result(self, job_id):
+        """
+        Result of a job that finished successfully; None while it is queued
+        or running, and for failed or cancelled jobs (see status() for why).
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or self._status(job) != 'done':
+                return None
+        return job['future'].result()
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job is not None and job['future'].cancel()
+
+    def jobs(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.status(job_id) for job_id in job_ids]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
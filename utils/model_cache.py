@@ -0,0 +1,153 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import MODEL_CACHE_FOLDER, MODEL_CACHE_MAX_MB
+from utils.profiling import count_cache
+
+
+def fingerprint(data, formula, family):
+    """
+    Content hash of the design data plus the model specification.
+
+    data is either a DataFrame (formula models) or a sequence of arrays such
+    as (X, y) for the array based GLMs.
+    """
+    digest = hashlib.sha256()
+    digest.update(str(formula).encode())
+    digest.update(str(family).encode())
+
+    if isinstance(data, pd.DataFrame):
+        digest.update(','.join(map(str, data.columns)).encode())
+        digest.update(','.join(map(str, data.dtypes)).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+    else:
+        for array in data:
+            array = np.ascontiguousarray(array)
+            digest.update(f'{array.shape}{array.dtype}'.encode())
+            digest.update(array.tobytes())
+
+    return digest.hexdigest()
+
+
+def summarize_fit(results):
+    # Keep only what the page renders; fitted results objects hold a copy of
+    # the design data and do not reliably survive pickling
+    return {
+        'summary': str(results.summary()),
+        'params': results.params,
+        'conf_int': results.conf_int(),
+    }
+
+
+class ModelCache:
+    """
+    Disk-backed cache of model fit summaries shared by every session, with
+    least-recently-used files removed once the folder exceeds max_bytes.
+    """
+
+    def __init__(self, folder, max_bytes):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.folder, f'{key}.pkl')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            with self._lock:
+                self.misses += 1
+            count_cache('models', False)
+            return None
+
+        # Bump the modification time so eviction is least-recently-used. The
+        # value is already read, so a file evicted meanwhile is still a hit
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        count_cache('models', True)
+        return value
+
+    def put(self, key, value):
+        os.makedirs(self.folder, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial pickle
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.folder):
+                if entry.name.endswith('.pkl'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+_cache = ModelCache(MODEL_CACHE_FOLDER, MODEL_CACHE_MAX_MB * 1024 * 1024)
+
+
+def get_model_cache():
+    return _cache
+
+
+def cached_fit(data, formula, family, fit):
+    """
+    Return the summary of a model fit, calling fit() only when the same data,
+    formula and family have not been fitted before. Failed fits (None) are not cached.
+
+    The cache is an optimisation: if the folder cannot be read or written
+    (full, read-only, removed), the model is simply fitted without it.
+    """
+    key = fingerprint(data, formula, family)
+    try:
+        summary = _cache.get(key)
+    except OSError:
+        summary = None
+    if summary is None:
+        results = fit()
+        if results is None:
+            return None
+        summary = summarize_fit(results)
+        try:
+            _cache.put(key, summary)
+        except OSError:
+            pass
+    return summary
@@ -0,0 +1,214 @@
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from config import EVENT_STORE_FILE, IMPORT_FOLDER, INGEST_POLL_SECONDS, INGEST_STAGING_FOLDER
+from utils.jobs import get_job_manager
+
+project_root = Path(__file__).resolve().parent.parent
+
+# Stages of the processing pipeline, in order. Each one is a script that reads
+# the previous stage's output from the folders in config.py.
+PIPELINE_SCRIPTS = [
+    "processes/1_start.py",
+    "processes/2_separate.py",
+    "processes/3_merge.py",
+    "processes/4_create_df.py",
+    "processes/5_remove_break_rounds.py",
+    "processes/6_no_blanks.py",
+    "processes/7_player_performance_per_round.py",
+    "processes/8_round_score_summary.py",
+    "processes/9_ignore_suicides.py",
+    "processes/10_player_performance_per_round_adjusted.py",
+    "processes/11_round_score_summary_after_adjusted.py",
+    "processes/12_additional_counters.py",
+    "processes/13_additional_counters_round_summary.py",
+    "processes/14_player_stats.py",
+    "processes/15_event_store.py",
+    "processes/16_arrow_datasets.py"
+]
+
+# Processed logs are moved here once their outputs are published
+PROCESSED_LOGS = 'processed'
+
+
+def run_pipeline(log_path, staging, progress=None):
+    """
+    Run every stage on one log with all folders pointed inside staging; returns
+    the folder holding the outputs.
+
+    Meant for a job worker: each stage runs as its own process, like
+    processes/run_all.py, and progress reports the stage about to start.
+    """
+    folders = {name: os.path.join(staging, name) for name in ['raw', 'logs', 'data']}
+    for folder in folders.values():
+        os.makedirs(folder, exist_ok=True)
+    shutil.copy2(log_path, folders['raw'])
+
+    env = {
+        **os.environ,
+        'PYTHONPATH': str(project_root),
+        'RAW_DATA_FOLDER': folders['raw'],
+        'LOG_FOLDER': folders['logs'],
+        'PROCESSED_DATA_FOLDER': folders['data'],
+        'EVENT_STORE_PATH': os.path.join(folders['data'], EVENT_STORE_FILE),
+    }
+    for index, script in enumerate(PIPELINE_SCRIPTS):
+        stage = Path(script).stem
+        if progress is not None:
+            progress(index / len(PIPELINE_SCRIPTS), f"Stage {index + 1}/{len(PIPELINE_SCRIPTS)}: {stage}")
+        result = subprocess.run([sys.executable, script], cwd=project_root, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            raise RuntimeError(f"{stage} failed: {error[-1] if error else f'exit code {result.returncode}'}")
+    if progress is not None:
+        progress(1.0, 'Publishing outputs')
+    return folders['data']
+
+
+def publish_outputs(folder):
+    """
+    Swap a finished run's outputs in for the ones the dashboard is reading.
+    The event store stays in the run's folder, so it switches with the datasets.
+    """
+    from utils.datasets import swap_datasets
+
+    swap_datasets(folder)
+
+
+class IngestService:
+    """
+    Turns logs uploaded or dropped into the import folder into pipeline jobs.
+
+    A daemon thread polls the folder, queues each new or changed log once on
+    the shared job pool, and publishes the outputs of jobs that succeed, so
+    the dashboard switches to the new data without blocking any page.
+    """
+
+    def __init__(self, folder=IMPORT_FOLDER, interval=INGEST_POLL_SECONDS):
+        self.folder = folder
+        self.interval = interval
+        self._jobs = {}
+        self._submitted = {}
+        self._pending = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll, name='ingest', daemon=True)
+                self._thread.start()
+
+    def _poll(self):
+        while True:
+            try:
+                self.scan()
+                self.publish_finished()
+            except Exception as e:
+                # Anything from a broken job pool to a bad file; the thread is never
+                # restarted, so log it and try again on the next poll
+                print(f"Ingest: {e!r}", file=sys.stderr)
+            time.sleep(self.interval)
+
+    def scan(self):
+        """
+        Queue the logs in the import folder that have not been queued yet. A
+        log is only picked up once it is unchanged since the previous scan,
+        so a file that is still being copied in is not processed half-written.
+        """
+        pending = {}
+        for path in sorted(glob.glob(os.path.join(self.folder, '*.log'))):
+            signature = _signature(path)
+            if signature in self._submitted:
+                continue
+            if self._pending.get(path) == signature:
+                self.submit(path)
+            else:
+                pending[path] = signature
+        self._pending = pending
+
+    def submit(self, path):
+        """Queue a pipeline run for one log and return its job ID."""
+        signature = _signature(path)
+        with self._lock:
+            if signature in self._submitted:
+                return self._submitted[signature]
+            os.makedirs(INGEST_STAGING_FOLDER, exist_ok=True)
+            staging = tempfile.mkdtemp(dir=INGEST_STAGING_FOLDER, prefix='run-')
+            job_id = get_job_manager().submit(run_pipeline, path, staging,
+                                              name=f"Pipeline: {os.path.basename(path)}")
+            self._submitted[signature] = job_id
+            self._jobs[job_id] = {'file': os.path.basename(path), 'path': path, 'staging': staging,
+                                  'published': False, 'error': None}
+            return job_id
+
+    def publish_finished(self):
+        manager = get_job_manager()
+        with self._lock:
+            waiting = [(job_id, job) for job_id, job in self._jobs.items()
+                       if not job['published'] and job['error'] is None]
+        for job_id, job in waiting:
+            status = manager.status(job_id)
+            if status is None or status['status'] in ('queued', 'running'):
+                continue
+            try:
+                if status['status'] == 'done':
+                    publish_outputs(manager.result(job_id))
+                    archive = os.path.join(self.folder, PROCESSED_LOGS)
+                    os.makedirs(archive, exist_ok=True)
+                    os.replace(job['path'], os.path.join(archive, job['file']))
+                    job['published'] = True
+                else:
+                    # Failed logs stay in the import folder; they are retried once they change
+                    job['error'] = status['error'] or status['status']
+            except OSError as e:
+                job['error'] = f"Publishing failed: {e}"
+            shutil.rmtree(job['staging'], ignore_errors=True)
+
+        # Forget runs the job pool no longer keeps a record of
+        with self._lock:
+            for job_id in [job_id for job_id in self._jobs if manager.status(job_id) is None]:
+                del self._jobs[job_id]
+
+    def jobs(self):
+        """Pipeline runs, most recent first, with the job pool's status and progress."""
+        manager = get_job_manager()
+        with self._lock:
+            jobs = list(self._jobs.items())
+        statuses = []
+        for job_id, job in reversed(jobs):
+            status = manager.status(job_id)
+            if status is None:
+                continue
+            status = {**status, 'file': job['file']}
+            if job['error'] is not None:
+                status.update(status='failed', error=job['error'])
+            elif status['status'] == 'done' and not job['published']:
+                # The outputs are ready but not yet swapped in
+                status.update(status='running', message='Publishing outputs')
+            statuses.append(status)
+        return statuses
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_ingest_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = IngestService()
+        return _service
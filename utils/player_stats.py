@@ -0,0 +1,27 @@
+def build_player_round_stats(df, sb):
+    """
+    One row per round summary row: the player's score in the round and the
+    deaths_total recorded against them as victim in that round.
+    """
+    deaths = (df.groupby(['victim_ip', 'game_round'], observed=True)['deaths_total'].sum()
+              .rename('deaths').rename_axis(['player_ip', 'game_round']).reset_index())
+    round_stats = sb[['player_ip', 'game_round', 'map', 'latency', 'score']].merge(
+        deaths, on=['player_ip', 'game_round'], how='left')
+    round_stats['deaths'] = round_stats['deaths'].fillna(0)
+    return round_stats
+
+
+def build_player_stats(round_stats):
+    """
+    Per-player totals and averages over all rounds, in order of first appearance.
+    """
+    player_stats = round_stats.groupby('player_ip', sort=False, observed=True).agg(
+        total_score=('score', 'sum'),
+        avg_score=('score', 'mean'),
+        rounds=('game_round', 'count'),
+    )
+    # Deaths are counted once per (player, round) even if a player has several summary rows
+    unique_rounds = round_stats.drop_duplicates(['player_ip', 'game_round'])
+    player_stats['total_deaths'] = unique_rounds.groupby('player_ip', sort=False, observed=True)['deaths'].sum()
+    player_stats['avg_deaths'] = player_stats['total_deaths'] / player_stats['rounds']
+    return player_stats.reset_index()
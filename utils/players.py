@@ -0,0 +1,81 @@
+import os
+
+import pandas as pd
+
+from config import PROCESSED_DATA_FOLDER
+
+# Dense integer codes for player identities. The dictionary is built once at
+# parse time (processes/4_create_df.py) and every table that names players is
+# read back as a categorical over it, so the codes are the same everywhere and
+# comparisons and group-bys on players work on integers instead of strings.
+
+PLAYER_DICTIONARY_FILE = 'players.csv'
+PLAYER_COLUMNS = ['killer_ip', 'victim_ip', 'player_ip']
+
+
+def player_dictionary_path():
+    return os.path.join(PROCESSED_DATA_FOLDER, PLAYER_DICTIONARY_FILE)
+
+
+def build_player_dictionary(df, columns=PLAYER_COLUMNS):
+    """
+    Assign codes 0..n-1 to every name in the given columns. Codes follow name
+    order, so sorting an encoded column gives the same order as sorting names.
+    """
+    columns = [column for column in columns if column in df.columns]
+    names = pd.unique(df[columns].to_numpy().ravel())
+    names = sorted(name for name in names if isinstance(name, str) and name != '')
+    return pd.DataFrame({'player_code': range(len(names)), 'player_name': names})
+
+
+def save_player_dictionary(dictionary, path=None):
+    dictionary.to_csv(path or player_dictionary_path(), index=False)
+
+
+def load_player_dictionary(path=None):
+    return pd.read_csv(path or player_dictionary_path(), keep_default_na=False)
+
+
+def player_dtype(dictionary):
+    # Categories in code order, so Categorical.codes are the dictionary codes
+    return pd.CategoricalDtype(dictionary.sort_values('player_code')['player_name'].tolist())
+
+
+def extend_player_dictionary(dictionary, names):
+    """Append codes for names not in the dictionary yet; existing codes never change."""
+    known = set(dictionary['player_name'])
+    new_names = [name for name in pd.unique(pd.Series(names, dtype=object).dropna())
+                 if isinstance(name, str) and name != '' and name not in known]
+    if not new_names:
+        return dictionary
+    start = int(dictionary['player_code'].max()) + 1 if len(dictionary) else 0
+    new_rows = pd.DataFrame({'player_code': range(start, start + len(new_names)), 'player_name': new_names})
+    return pd.concat([dictionary, new_rows], ignore_index=True)
+
+
+def encode_players(df, dictionary, columns=PLAYER_COLUMNS):
+    """
+    Return df with its player columns as categoricals over the dictionary.
+
+    Names missing from the dictionary (e.g. tables produced by an older run)
+    get codes appended after the known ones rather than becoming NaN.
+    """
+    columns = [column for column in columns if column in df.columns]
+    if not columns:
+        return df
+    dictionary = extend_player_dictionary(dictionary, df[columns].to_numpy().ravel())
+    dtype = player_dtype(dictionary)
+    df = df.copy(deep=False)
+    for column in columns:
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def player_codes(series):
+    """Integer codes of an encoded player column; -1 marks a missing player."""
+    return pd.Series(series.cat.codes, index=series.index)
+
+
+def player_names(codes, dictionary):
+    """Display names for an array of codes (-1 maps to NaN)."""
+    return pd.Categorical.from_codes(codes, dtype=player_dtype(dictionary))
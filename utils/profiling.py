@@ -0,0 +1,255 @@
+import cProfile
+import contextvars
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from config import PAGE_TIMINGS_LOG, PAGE_TIMINGS_LOG_MB
+
+# Streamlit calls that serialise data for the browser; time spent in them is
+# reported as render. Everything a page does outside load and render is compute.
+RENDER_METHODS = ['plotly_chart', 'altair_chart', 'vega_lite_chart', 'pyplot', 'dataframe', 'data_editor',
+                  'table', 'line_chart', 'bar_chart', 'area_chart', 'scatter_chart', 'map']
+
+HISTORY = 20
+PROFILE_LINES = 40
+
+# The run being timed. A context variable rather than a thread local, so work a
+# page hands to a thread pool through contextvars.copy_context().run is counted too
+_current_run = contextvars.ContextVar('page_run', default=None)
+_lock = threading.Lock()
+_logger = None
+_instrumented = False
+
+
+class PageRun:
+    """
+    Timings of one page rerun. Sections nest: time spent in an inner section
+    is taken off the outer one, so load inside render is only counted once.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.started = datetime.now()
+        self.total = 0.0
+        self.sections = {'load': 0.0, 'render': 0.0}
+        self.cache = {}
+        self.profile = None
+        self._thread = threading.get_ident()
+        self._stacks = {}
+        self._intervals = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def section(self, name):
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        frame = [time.perf_counter(), 0.0]
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            end = time.perf_counter()
+            elapsed = end - frame[0]
+            if stack:
+                stack[-1][1] += elapsed
+            if threading.get_ident() == self._thread:
+                self.sections[name] = self.sections.get(name, 0.0) + elapsed - frame[1]
+            else:
+                # Worker threads run side by side, so their sections are merged
+                # by wall-clock time in breakdown rather than added up
+                with self._lock:
+                    self._intervals.setdefault(name, []).append((frame[0], end))
+
+    def count(self, cache, hit):
+        with self._lock:
+            counts = self.cache.setdefault(cache, {'hits': 0, 'misses': 0})
+            counts['hits' if hit else 'misses'] += 1
+
+    def breakdown(self):
+        sections = dict(self.sections)
+        with self._lock:
+            for name, intervals in self._intervals.items():
+                sections[name] = sections.get(name, 0.0) + _wall_time(intervals)
+        sections['compute'] = max(self.total - sum(sections.values()), 0.0)
+        return {name: sections.get(name, 0.0) for name in ['load', 'compute', 'render']}
+
+    def to_record(self):
+        return {
+            'time': self.started.isoformat(timespec='seconds'),
+            'page': self.page,
+            'total': round(self.total, 4),
+            **{name: round(seconds, 4) for name, seconds in self.breakdown().items()},
+            'cache': self.cache,
+            'profiled': self.profile is not None,
+        }
+
+
+def _wall_time(intervals):
+    # Length of the union of (start, end) intervals
+    total, covered = 0.0, None
+    for start, end in sorted(intervals):
+        if covered is not None and start < covered:
+            start = covered
+        if end > start:
+            total += end - start
+        covered = end if covered is None else max(covered, end)
+    return total
+
+
+@contextmanager
+def section(name):
+    """
+    Attribute the enclosed time to a section of the current page run, if any.
+    Outside a timed rerun (pipeline scripts, benchmarks) this does nothing.
+    """
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    with run.section(name):
+        yield
+
+
+def _timed_render(method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with section('render'):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def instrument_streamlit():
+    """
+    Wrap the Streamlit render calls once per process, on the DeltaGenerator
+    class for containers and on the st.* aliases bound to the main one.
+    """
+    global _instrumented
+    with _lock:
+        if _instrumented:
+            return
+        import streamlit as st
+        from streamlit.delta_generator import DeltaGenerator
+
+        for name in RENDER_METHODS:
+            if hasattr(DeltaGenerator, name):
+                setattr(DeltaGenerator, name, _timed_render(getattr(DeltaGenerator, name)))
+            if hasattr(st, name):
+                setattr(st, name, _timed_render(getattr(st, name)))
+        _instrumented = True
+
+
+def count_cache(cache, hit):
+    """
+    Count a cache lookup against the current page run, if any. Runs are kept
+    per context, so concurrent sessions do not show up in each other's counts.
+    """
+    run = _current_run.get()
+    if run is not None:
+        run.count(cache, hit)
+
+
+def _profile_stats(profiler):
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(PROFILE_LINES)
+    # dump_stats only writes to a path; the bytes load with pstats or snakeviz
+    with tempfile.NamedTemporaryFile(suffix='.prof') as file:
+        profiler.dump_stats(file.name)
+        data = file.read()
+    return {'text': text.getvalue(), 'data': data}
+
+
+def _get_logger():
+    global _logger
+    with _lock:
+        if _logger is None:
+            logger = logging.getLogger('page_timings')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            folder = os.path.dirname(PAGE_TIMINGS_LOG)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            handler = RotatingFileHandler(PAGE_TIMINGS_LOG, maxBytes=PAGE_TIMINGS_LOG_MB * 1024 * 1024,
+                                          backupCount=3)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            _logger = logger
+        return _logger
+
+
+@contextmanager
+def time_page(page, profile=False):
+    """
+    Time one page rerun and append it as a JSON line to the rolling timings log.
+
+    With profile=True the rerun also runs under cProfile; the stats end up on
+    run.profile as printable text and as a .prof file's bytes.
+    """
+    run = PageRun(page)
+    profiler = cProfile.Profile() if profile else None
+    token = _current_run.set(run)
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield run
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        run.total = time.perf_counter() - start
+        _current_run.reset(token)
+        if profiler is not None:
+            run.profile = _profile_stats(profiler)
+        try:
+            _get_logger().info(json.dumps(run.to_record()))
+        except OSError:
+            # Timings are diagnostics; a read-only or full disk must not break the page
+            pass
+
+
+def show_dev_panel(run):
+    """Sidebar panel with this session's recent page timings and the profiler toggle."""
+    import pandas as pd
+    import streamlit as st
+
+    history = st.session_state.setdefault('page_timings', [])
+    if run is not None:
+        history.append(run.to_record())
+        del history[:-HISTORY]
+        if run.profile is not None:
+            st.session_state.page_profile = {'page': run.page, 'time': run.started, **run.profile}
+
+    with st.sidebar.expander("Developer panel", expanded=True):
+        if run is not None:
+            breakdown = run.breakdown()
+            st.metric(f"{run.page} rerun", f"{run.total * 1000:.0f} ms")
+            st.caption(" · ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in breakdown.items()))
+            if run.cache:
+                st.caption("Cache: " + ", ".join(f"{cache} {counts['hits']} hit(s) / {counts['misses']} miss(es)"
+                                                 for cache, counts in run.cache.items()))
+
+        if history:
+            frame = pd.DataFrame(history)[['time', 'page', 'total', 'load', 'compute', 'render']]
+            st.dataframe(frame.iloc[::-1], hide_index=True)
+
+        st.toggle("Profile one rerun", key='profile_rerun',
+                  help="Runs the next page rerun under cProfile; switches itself off afterwards.")
+
+        st.caption(f"Timings are logged to {PAGE_TIMINGS_LOG}")
+
+    profile = st.session_state.get('page_profile')
+    if profile is not None:
+        with st.sidebar.expander(f"Profile: {profile['page']} at {profile['time']:%H:%M:%S}"):
+            st.download_button("Download .prof", profile['data'],
+                               file_name=f"{profile['page'].lower()}_{profile['time']:%Y%m%d_%H%M%S}.prof",
+                               mime='application/octet-stream')
+            st.code(profile['text'], language=None)
@@ -0,0 +1,30 @@
+import threading
+
+_started = False
+_lock = threading.Lock()
+
+
+def start_background_services():
+    """
+    Start the ingest service and the activity watcher, once per server process.
+
+    Both are imported and started on a thread of their own: the activity store
+    pulls in numpy, pandas and pyarrow, which the Home page does not need, so
+    the first rerun does not wait for them.
+    """
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_start, name='start-services', daemon=True).start()
+
+
+def _start():
+    from utils.activity_store import get_activity_watcher
+    from utils.pipeline import get_ingest_service
+
+    # Logs dropped into the import folder are processed, and new activity files
+    # converted, by one background watcher each per server
+    get_ingest_service().start()
+    get_activity_watcher().start()
@@ -0,0 +1,4 @@
+import streamlit as st
+
+# st.fragment was promoted from st.experimental_fragment in Streamlit 1.37
+fragment = getattr(st, 'fragment', None) or st.experimental_fragment